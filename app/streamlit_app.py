@@ -7,6 +7,8 @@ import sys
 import os
 import traceback
 
+import streamlit as st
+
 # Add the current directory to Python path so we can import src modules
 current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)  # Go up one level to project root
@@ -18,22 +20,40 @@ if src_path not in sys.path:
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
 
+
+@st.cache_resource(show_spinner=False)
+def prewarm(db_url: str):
+    """Load the model, engine and demo dataset once per server process"""
+    from eval.datasets.dataset_loader import DatasetLoader
+    from src.service.resources import get_ui_singletons
+
+    singletons = get_ui_singletons(db_url)
+    dataset = DatasetLoader().load_custom_dataset("demo_dataset.json")
+    return singletons, dataset
+
+
 # Now import and run the main Streamlit app
 try:
+    from config.config import config, configure
+
+    configure()
+
+    try:
+        prewarm(config.DATABASE_URL)
+    except Exception as e:
+        # Model/database errors are reported by the UI on first use
+        print(f"⚠️  Pre-warm failed: {e}")
+
     # Import the main UI module
     from service.ui_streamlit import *
 
     print("✅ Successfully imported UI module")
 except ImportError as e:
-    import streamlit as st
-
     st.error(f"❌ Import error: {e}")
     st.error("Please check that all dependencies are installed correctly.")
     st.code(traceback.format_exc())
     st.stop()
 except Exception as e:
-    import streamlit as st
-
     st.error(f"❌ Unexpected error during import: {e}")
     st.error("This might be a deployment configuration issue.")
     st.code(traceback.format_exc())
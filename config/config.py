@@ -3,98 +3,187 @@ Configuration management for Text-to-SQL Assistant
 """
 
 import os
-from typing import Optional
+from dataclasses import dataclass
+from typing import Mapping, Optional
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
 
+@dataclass(frozen=True, slots=True)
 class Config:
     """Application configuration class"""
 
     # Application
-    APP_NAME: str = os.getenv("APP_NAME", "Text-to-SQL Assistant")
-    APP_VERSION: str = os.getenv("APP_VERSION", "1.0.0")
-    DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
-    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    APP_NAME: str
+    APP_VERSION: str
+    DEBUG: bool
+    LOG_LEVEL: str
 
     # Database
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///data/demo.sqlite")
-    DATABASE_TYPE: str = os.getenv("DATABASE_TYPE", "sqlite")
+    DATABASE_URL: str
+    DATABASE_TYPE: str
 
     # Model Configuration
-    MODEL_NAME: str = os.getenv("MODEL_NAME", "google/flan-t5-base")
-    MODEL_CACHE_DIR: str = os.getenv("MODEL_CACHE_DIR", "./models")
-    MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "128"))
-    NUM_BEAMS: int = int(os.getenv("NUM_BEAMS", "4"))
-    MAX_INPUT_LENGTH: int = int(os.getenv("MAX_INPUT_LENGTH", "400"))
+    MODEL_NAME: str
+    MODEL_CACHE_DIR: str
+    MAX_TOKENS: int
+    NUM_BEAMS: int
+    MAX_INPUT_LENGTH: int
+    GENERATION_BATCH_SIZE: int
+    USE_BF16: bool
+    ENABLE_COMPILE: bool
+    QUANTIZATION: str
+    USE_ONNX: bool
 
     # Streamlit Configuration
-    STREAMLIT_SERVER_PORT: int = int(
-        os.getenv("PORT", os.getenv("STREAMLIT_SERVER_PORT", "8501"))
-    )
-    STREAMLIT_SERVER_ADDRESS: str = os.getenv("STREAMLIT_SERVER_ADDRESS", "0.0.0.0")
-    STREAMLIT_THEME_BASE: str = os.getenv("STREAMLIT_THEME_BASE", "light")
+    STREAMLIT_SERVER_PORT: int
+    STREAMLIT_SERVER_ADDRESS: str
+    STREAMLIT_THEME_BASE: str
 
     # API Configuration
-    API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
-    API_PORT: int = int(os.getenv("API_PORT", "8000"))
-    API_WORKERS: int = int(os.getenv("API_WORKERS", "1"))
+    API_HOST: str
+    API_PORT: int
+    API_WORKERS: int
 
     # Safety Configuration
-    DEFAULT_QUERY_LIMIT: int = int(os.getenv("DEFAULT_QUERY_LIMIT", "200"))
-    MAX_QUERY_LIMIT: int = int(os.getenv("MAX_QUERY_LIMIT", "10000"))
-    ENABLE_SAFETY_CHECKS: bool = (
-        os.getenv("ENABLE_SAFETY_CHECKS", "True").lower() == "true"
-    )
+    DEFAULT_QUERY_LIMIT: int
+    MAX_QUERY_LIMIT: int
+    ENABLE_SAFETY_CHECKS: bool
 
     # Performance Configuration
-    ENABLE_MODEL_CACHING: bool = (
-        os.getenv("ENABLE_MODEL_CACHING", "True").lower() == "true"
-    )
-    MODEL_LOAD_TIMEOUT: int = int(os.getenv("MODEL_LOAD_TIMEOUT", "60"))
-    QUERY_TIMEOUT: int = int(os.getenv("QUERY_TIMEOUT", "30"))
+    ENABLE_MODEL_CACHING: bool
+    SQL_CACHE_SIZE: int
+    MODEL_LOAD_TIMEOUT: int
+    QUERY_TIMEOUT: int
 
     # Evaluation Configuration
-    EVALUATION_RESULTS_DIR: str = os.getenv("EVALUATION_RESULTS_DIR", "results")
-    EVALUATION_REPORTS_DIR: str = os.getenv("EVALUATION_REPORTS_DIR", "results/reports")
-    EVALUATION_BENCHMARKS_DIR: str = os.getenv(
-        "EVALUATION_BENCHMARKS_DIR", "results/benchmarks"
-    )
-    EVALUATION_TIMEOUT: int = int(os.getenv("EVALUATION_TIMEOUT", "300"))
-    MAX_EVALUATION_QUESTIONS: int = int(os.getenv("MAX_EVALUATION_QUESTIONS", "100"))
+    EVALUATION_RESULTS_DIR: str
+    EVALUATION_REPORTS_DIR: str
+    EVALUATION_BENCHMARKS_DIR: str
+    EVALUATION_TIMEOUT: int
+    MAX_EVALUATION_QUESTIONS: int
 
-    @classmethod
-    def validate(cls) -> bool:
+    def validate(self) -> bool:
         """Validate configuration"""
         required_settings = ["DATABASE_URL", "MODEL_NAME"]
 
         for setting in required_settings:
-            if not getattr(cls, setting):
+            if not getattr(self, setting):
                 raise ValueError(f"Required setting {setting} is not configured")
 
+        if self.QUANTIZATION not in ("none", "int8", "int4"):
+            raise ValueError(
+                f"QUANTIZATION must be none, int8 or int4, got {self.QUANTIZATION}"
+            )
+
         return True
 
-    @classmethod
-    def get_database_url(cls) -> str:
+    def get_database_url(self) -> str:
         """Get database URL with fallback"""
-        if cls.DATABASE_URL.startswith("sqlite:///"):
+        if self.DATABASE_URL.startswith("sqlite:///"):
             # Ensure the directory exists for SQLite
-            db_path = cls.DATABASE_URL.replace("sqlite:///", "")
+            db_path = self.DATABASE_URL.replace("sqlite:///", "")
             db_dir = os.path.dirname(db_path)
             if db_dir and not os.path.exists(db_dir):
                 os.makedirs(db_dir, exist_ok=True)
 
-        return cls.DATABASE_URL
+        return self.DATABASE_URL
+
+
+def _build_config(env: Optional[Mapping[str, str]] = None) -> Config:
+    """Build the configuration from a single snapshot of the environment"""
+    env = dict(os.environ) if env is None else env
+
+    def _bool(key: str, default: str) -> bool:
+        return env.get(key, default).lower() == "true"
+
+    def _int(key: str, default: str) -> int:
+        return int(env.get(key, default))
+
+    return Config(
+        # Application
+        APP_NAME=env.get("APP_NAME", "Text-to-SQL Assistant"),
+        APP_VERSION=env.get("APP_VERSION", "1.0.0"),
+        DEBUG=_bool("DEBUG", "False"),
+        LOG_LEVEL=env.get("LOG_LEVEL", "INFO"),
+        # Database
+        DATABASE_URL=env.get("DATABASE_URL", "sqlite:///data/demo.sqlite"),
+        DATABASE_TYPE=env.get("DATABASE_TYPE", "sqlite"),
+        # Model Configuration
+        MODEL_NAME=env.get("MODEL_NAME", "google/flan-t5-base"),
+        MODEL_CACHE_DIR=env.get("MODEL_CACHE_DIR", "./models"),
+        MAX_TOKENS=_int("MAX_TOKENS", "128"),
+        NUM_BEAMS=_int("NUM_BEAMS", "1"),
+        MAX_INPUT_LENGTH=_int("MAX_INPUT_LENGTH", "400"),
+        GENERATION_BATCH_SIZE=_int("GENERATION_BATCH_SIZE", "8"),
+        USE_BF16=_bool("USE_BF16", "False"),
+        ENABLE_COMPILE=_bool("ENABLE_COMPILE", "False"),
+        QUANTIZATION=env.get("QUANTIZATION", "none").lower(),
+        USE_ONNX=_bool("USE_ONNX", "False"),
+        # Streamlit Configuration
+        STREAMLIT_SERVER_PORT=int(
+            env.get("PORT", env.get("STREAMLIT_SERVER_PORT", "8501"))
+        ),
+        STREAMLIT_SERVER_ADDRESS=env.get("STREAMLIT_SERVER_ADDRESS", "0.0.0.0"),
+        STREAMLIT_THEME_BASE=env.get("STREAMLIT_THEME_BASE", "light"),
+        # API Configuration
+        API_HOST=env.get("API_HOST", "0.0.0.0"),
+        API_PORT=_int("API_PORT", "8000"),
+        API_WORKERS=_int("API_WORKERS", "1"),
+        # Safety Configuration
+        DEFAULT_QUERY_LIMIT=_int("DEFAULT_QUERY_LIMIT", "200"),
+        MAX_QUERY_LIMIT=_int("MAX_QUERY_LIMIT", "10000"),
+        ENABLE_SAFETY_CHECKS=_bool("ENABLE_SAFETY_CHECKS", "True"),
+        # Performance Configuration
+        ENABLE_MODEL_CACHING=_bool("ENABLE_MODEL_CACHING", "True"),
+        SQL_CACHE_SIZE=_int("SQL_CACHE_SIZE", "256"),
+        MODEL_LOAD_TIMEOUT=_int("MODEL_LOAD_TIMEOUT", "60"),
+        QUERY_TIMEOUT=_int("QUERY_TIMEOUT", "30"),
+        # Evaluation Configuration
+        EVALUATION_RESULTS_DIR=env.get("EVALUATION_RESULTS_DIR", "results"),
+        EVALUATION_REPORTS_DIR=env.get("EVALUATION_REPORTS_DIR", "results/reports"),
+        EVALUATION_BENCHMARKS_DIR=env.get(
+            "EVALUATION_BENCHMARKS_DIR", "results/benchmarks"
+        ),
+        EVALUATION_TIMEOUT=_int("EVALUATION_TIMEOUT", "300"),
+        MAX_EVALUATION_QUESTIONS=_int("MAX_EVALUATION_QUESTIONS", "100"),
+    )
 
 
 # Global config instance
-config = Config()
-
-# Validate configuration on import
-try:
-    config.validate()
-except ValueError as e:
-    print(f"Configuration error: {e}")
-    print("Please check your environment variables or .env file")
+config = _build_config()
+
+_configured = False
+
+
+def configure(strict: bool = True) -> Config:
+    """
+    Validate the global configuration once per process
+
+    Entry points (CLI, Streamlit) call this at start-up; library code and
+    worker processes skip it.
+
+    Args:
+        strict: Raise on invalid configuration (the default, to fail fast at
+            start-up); False prints a warning and continues
+
+    Returns:
+        The global configuration
+    """
+    global _configured
+
+    if _configured:
+        return config
+
+    try:
+        config.validate()
+    except ValueError as e:
+        if strict:
+            raise
+        print(f"Configuration error: {e}")
+        print("Please check your environment variables or .env file")
+
+    _configured = True
+    return config
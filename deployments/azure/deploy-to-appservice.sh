@@ -114,7 +114,7 @@ az webapp config appsettings set \
     DATABASE_URL="sqlite:///data/demo.sqlite" \
     MODEL_NAME="google/flan-t5-base" \
     MAX_TOKENS="128" \
-    NUM_BEAMS="4" \
+    NUM_BEAMS="1" \
     ENABLE_MODEL_CACHING="true" \
     LOG_LEVEL="INFO" \
     STREAMLIT_SERVER_PORT="8501" \
@@ -51,10 +51,10 @@ if [ "$ENABLE_MODEL_CACHING" = "true" ]; then
     echo "🧠 Pre-loading language model..."
     python -c "
 import sys
-sys.path.insert(0, '/app/src')
-from nlp.generator import T2SQLGenerator
+sys.path.insert(0, '/app')
+from src.nlp.generator import T2SQLGenerator
 try:
-    gen = T2SQLGenerator()
+    gen = T2SQLGenerator(schema_txt='')
     print('✅ Language model loaded and cached')
 except Exception as e:
     print(f'⚠️  Model pre-loading failed: {e}')
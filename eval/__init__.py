@@ -9,9 +9,14 @@ This module provides comprehensive evaluation capabilities including:
 - Report generation and visualization
 """
 
-from .evaluator import Text2SQLEvaluator
-from .benchmark import BenchmarkRunner
-from .report_generator import ReportGenerator
+import importlib
+
+# Public classes are imported on first access to keep package import cheap
+_EXPORTS = {
+    "Text2SQLEvaluator": ".evaluator",
+    "BenchmarkRunner": ".benchmark",
+    "ReportGenerator": ".report_generator",
+}
 
 __all__ = [
     "Text2SQLEvaluator",
@@ -20,3 +25,10 @@ __all__ = [
 ]
 
 __version__ = "1.0.0"
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        module = importlib.import_module(_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
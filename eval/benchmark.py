@@ -8,21 +8,160 @@ Provides systematic benchmarking capabilities including:
 - Continuous integration support
 """
 
+from __future__ import annotations
+
+import os
 import time
-import json
+import hashlib
 import argparse
-from typing import Dict, List, Any, Optional
+import copy
+import functools
+from dataclasses import asdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Callable, Dict, List, Any, Optional, Tuple
 from pathlib import Path
 from datetime import datetime
 
-from .evaluator import Text2SQLEvaluator, AggregateEvaluationResults
-from .datasets.dataset_loader import DatasetLoader
-from .report_generator import ReportGenerator
+from config.config import config, configure
+from src.utils.json_io import dump_json, load_json
 from src.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from .datasets.dataset_loader import Dataset
+    from .evaluator import Text2SQLEvaluator, AggregateEvaluationResults
+
 logger = get_logger("text2sql.benchmark")
 
 
+@functools.lru_cache(maxsize=4)
+def _get_evaluator(database_url: str) -> Text2SQLEvaluator:
+    """Return a process-wide evaluator for the given database URL"""
+    from .evaluator import Text2SQLEvaluator
+
+    return Text2SQLEvaluator(database_url)
+
+
+def _run_one(
+    database_url: str,
+    results_dir: str,
+    dataset: str,
+    model: str,
+    cuda_device: Optional[str] = None,
+    cpu_threads: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Run a single (dataset, model) benchmark in a worker process"""
+    _pin_worker(cuda_device, cpu_threads)
+
+    runner = BenchmarkRunner(database_url, results_dir)
+    results = runner.run_benchmark(dataset, model)
+    return asdict(results)
+
+
+def _evaluate_model(
+    database_url: str,
+    dataset: Dataset,
+    model: str,
+    cuda_device: Optional[str] = None,
+    cpu_threads: Optional[int] = None,
+) -> AggregateEvaluationResults:
+    """Evaluate one model on a preloaded dataset in a worker process"""
+    _pin_worker(cuda_device, cpu_threads)
+
+    return _get_evaluator(database_url).evaluate_dataset(dataset, model)
+
+
+def _pin_worker(cuda_device: Optional[str], cpu_threads: Optional[int]) -> None:
+    """Restrict a worker process to one GPU, or to its share of the CPU cores"""
+    if cuda_device is not None:
+        os.environ["CUDA_VISIBLE_DEVICES"] = cuda_device
+    if cpu_threads is not None:
+        import torch
+
+        torch.set_num_threads(cpu_threads)
+
+
+def _gpu_slots() -> List[str]:
+    """Physical device ids to pin workers to, empty when running on CPU"""
+    try:
+        import torch
+    except ImportError:
+        return []
+
+    device_count = torch.cuda.device_count()
+    visible = os.environ.get("CUDA_VISIBLE_DEVICES")
+    if visible is None:
+        return [str(i) for i in range(device_count)]
+
+    # Logical device i is the i-th entry of the parent's own allocation
+    return [d.strip() for d in visible.split(",") if d.strip()][:device_count]
+
+
+def _worker_slots(
+    tasks: int, max_workers: Optional[int]
+) -> Tuple[int, List[str], Optional[int]]:
+    """Worker count, GPU ids to round-robin and per-worker CPU threads"""
+    gpu_slots = _gpu_slots()
+    cpu_count = os.cpu_count() or 1
+    if max_workers is None:
+        # With GPUs, run one worker per device so models don't share memory
+        max_workers = len(gpu_slots) or cpu_count
+    max_workers = max(1, min(tasks, max_workers))
+
+    # On CPU each worker's torch would otherwise spawn a thread per core
+    cpu_threads = None if gpu_slots else max(1, cpu_count // max_workers)
+    return max_workers, gpu_slots, cpu_threads
+
+
+def _read_result(path: str) -> Optional[Dict[str, Any]]:
+    """Load one result file, returning None if it can't be parsed"""
+    try:
+        return load_json(path)
+    except Exception as e:
+        logger.warning(f"Could not read result file {path}: {str(e)}")
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _summarize_results(results_dir: Path, mtime_ns: int) -> Dict[str, Any]:
+    """Parse all result files; cached until the results directory changes"""
+    # One directory scan; DirEntry caches the stat used to find the latest file
+    with os.scandir(results_dir) as it:
+        result_files = [
+            entry
+            for entry in it
+            if entry.name.startswith("evaluation_") and entry.name.endswith(".json")
+        ]
+
+    if not result_files:
+        return {"message": "No evaluation files found"}
+
+    summary = {
+        "total_benchmarks": len(result_files),
+        "latest_benchmark": max(result_files, key=lambda e: e.stat().st_mtime).name,
+        "benchmarks": [],
+    }
+
+    # Reads are IO-bound, so overlap them across threads
+    with ThreadPoolExecutor(max_workers=min(16, len(result_files))) as executor:
+        parsed = executor.map(_read_result, [e.path for e in result_files])
+
+        for result_file, data in zip(result_files, parsed):
+            if data is None:
+                continue
+
+            summary["benchmarks"].append(
+                {
+                    "file": result_file.name,
+                    "dataset": data.get("dataset_name", "Unknown"),
+                    "f1_score": data.get("avg_f1_score", 0),
+                    "execution_success_rate": data.get("execution_success_rate", 0),
+                    "total_questions": data.get("total_questions", 0),
+                }
+            )
+
+    return summary
+
+
 class BenchmarkRunner:
     """Systematic benchmark runner for Text-to-SQL evaluation"""
 
@@ -31,11 +170,15 @@ class BenchmarkRunner:
         database_url: str = "sqlite:///data/demo.sqlite",
         results_dir: str = "results/benchmarks",
     ):
+        # Deferred so CLI paths like --help don't pay for heavy imports
+        from .datasets.dataset_loader import DatasetLoader
+        from .report_generator import ReportGenerator
+
         self.database_url = database_url
         self.results_dir = Path(results_dir)
         self.results_dir.mkdir(parents=True, exist_ok=True)
 
-        self.evaluator = Text2SQLEvaluator(database_url)
+        self.evaluator = _get_evaluator(database_url)
         self.dataset_loader = DatasetLoader()
         self.report_generator = ReportGenerator()
 
@@ -47,6 +190,7 @@ class BenchmarkRunner:
         model_name: Optional[str] = None,
         difficulty_filter: Optional[str] = None,
         tag_filter: Optional[List[str]] = None,
+        batch_size: Optional[int] = None,
     ) -> AggregateEvaluationResults:
         """Run benchmark evaluation"""
 
@@ -66,8 +210,12 @@ class BenchmarkRunner:
             dataset = self.dataset_loader.filter_dataset_by_tags(dataset, tag_filter)
             logger.info(f"Filtered by tags: {tag_filter}")
 
-        # Run evaluation
-        results = self.evaluator.evaluate_dataset(dataset, model_name)
+        # Run evaluation, streaming per-question results as they complete
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        stream_path = self.results_dir / f"questions_{dataset_name}_{timestamp}.jsonl"
+        results = self.evaluator.evaluate_dataset(
+            dataset, model_name, batch_size, stream_path=str(stream_path)
+        )
 
         # Save results
         self.evaluator.save_results(results, str(self.results_dir))
@@ -81,18 +229,64 @@ class BenchmarkRunner:
         return results
 
     def run_model_comparison(
-        self, dataset_name: str, model_names: List[str]
+        self,
+        dataset_name: str,
+        model_names: List[str],
+        dataset: Optional[Dataset] = None,
+        max_workers: Optional[int] = None,
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        precomputed: Optional[Dict[str, AggregateEvaluationResults]] = None,
     ) -> Dict[str, AggregateEvaluationResults]:
-        """Compare multiple models on the same dataset"""
+        """
+        Compare multiple models on the same dataset
+
+        Each model is evaluated in its own worker process. progress_callback,
+        if given, is called with (model_name, completed, total) as models finish.
+        Models with results in precomputed are reported without re-evaluation.
+        """
 
         logger.info(f"Running model comparison on {dataset_name}")
         logger.info(f"Models: {model_names}")
 
-        # Load dataset
-        dataset = self.dataset_loader.load_custom_dataset(f"{dataset_name}.json")
+        results = dict(precomputed or {})
+        model_names_to_run = [name for name in model_names if name not in results]
+
+        # Load dataset once; workers receive it pickled instead of re-reading it
+        if dataset is None and model_names_to_run:
+            dataset = self.dataset_loader.load_custom_dataset(f"{dataset_name}.json")
+
+        # Download each checkpoint once so workers load from local disk only
+        self._warm_model_cache(model_names_to_run)
+
+        max_workers, gpu_slots, cpu_threads = _worker_slots(
+            len(model_names_to_run), max_workers
+        )
 
-        # Run comparisons
-        comparison_results = self.evaluator.compare_models(dataset, model_names)
+        # One task per child: the generator is a per-process singleton
+        with ProcessPoolExecutor(
+            max_workers=max_workers, max_tasks_per_child=1
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _evaluate_model,
+                    self.database_url,
+                    dataset,
+                    model_name,
+                    gpu_slots[i % len(gpu_slots)] if gpu_slots else None,
+                    cpu_threads,
+                ): model_name
+                for i, model_name in enumerate(model_names_to_run)
+            }
+
+            for completed, future in enumerate(as_completed(futures), 1):
+                model_name = futures[future]
+                results[model_name] = future.result()
+                logger.info(f"Finished model {model_name} ({completed}/{len(futures)})")
+                if progress_callback is not None:
+                    progress_callback(model_name, completed, len(futures))
+
+        # Keep the caller's model order regardless of completion order
+        comparison_results = {name: results[name] for name in model_names}
 
         # Save comparison results
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -104,13 +298,11 @@ class BenchmarkRunner:
             "dataset": dataset_name,
             "timestamp": timestamp,
             "models": {
-                name: self._results_to_dict(results)
-                for name, results in comparison_results.items()
+                name: asdict(results) for name, results in comparison_results.items()
             },
         }
 
-        with open(comparison_file, "w", encoding="utf-8") as f:
-            json.dump(comparison_data, f, indent=2, ensure_ascii=False)
+        dump_json(comparison_data, comparison_file)
 
         # Generate comparison report
         report_path = self.report_generator.generate_comparison_report(
@@ -133,12 +325,31 @@ class BenchmarkRunner:
 
         logger.info(f"Running regression test: {baseline_model} vs {current_model}")
 
-        # Run evaluations
-        comparison_results = self.run_model_comparison(
-            dataset_name, [baseline_model, current_model]
-        )
+        # Reuse the stored baseline run unless any of its inputs changed since
+        baseline_file = self._baseline_path(dataset_name, baseline_model)
+        fingerprint = self._baseline_fingerprint(dataset_name, baseline_model)
+        baseline_results = self._load_baseline(baseline_file, fingerprint)
+
+        # Run evaluations; a cached baseline still appears in the comparison output
+        if baseline_results is not None:
+            logger.info(f"Using cached baseline results: {baseline_file}")
+            comparison_results = self.run_model_comparison(
+                dataset_name,
+                [baseline_model, current_model],
+                precomputed={baseline_model: baseline_results},
+            )
+        else:
+            comparison_results = self.run_model_comparison(
+                dataset_name, [baseline_model, current_model]
+            )
+            baseline_results = comparison_results[baseline_model]
+            # Fingerprint after the run: comparison may download the snapshot
+            fingerprint = self._baseline_fingerprint(dataset_name, baseline_model)
+            dump_json(
+                {"fingerprint": fingerprint, "results": asdict(baseline_results)},
+                baseline_file,
+            )
 
-        baseline_results = comparison_results[baseline_model]
         current_results = comparison_results[current_model]
 
         # Check if current model meets threshold of baseline performance
@@ -158,8 +369,84 @@ class BenchmarkRunner:
 
         return regression_passed
 
+    def _baseline_path(self, dataset_name: str, model_name: str) -> Path:
+        """Path of the cached baseline results for a dataset/model pair"""
+        safe_name = model_name.replace("/", "--")
+        return self.results_dir / f"baseline_{safe_name}_{dataset_name}.json"
+
+    def _baseline_fingerprint(
+        self, dataset_name: str, model_name: str
+    ) -> Dict[str, Any]:
+        """Everything a cached baseline run depends on"""
+        # Hugging Face cache layout: <cache_dir>/models--<org>--<name>/refs/main
+        # holds the sha of the snapshot from_pretrained loads
+        ref_file = (
+            Path(config.MODEL_CACHE_DIR)
+            / f"models--{model_name.replace('/', '--')}"
+            / "refs"
+            / "main"
+        )
+        dataset_file = (
+            self.dataset_loader.datasets_dir / "custom" / f"{dataset_name}.json"
+        )
+
+        try:
+            snapshot = ref_file.read_text().strip()
+        except OSError:
+            snapshot = None
+        try:
+            dataset_hash = hashlib.sha256(dataset_file.read_bytes()).hexdigest()
+        except OSError:
+            dataset_hash = None
+
+        return {
+            "model_name": model_name,
+            "model_snapshot": snapshot,
+            "dataset_sha256": dataset_hash,
+            "database_url": self.database_url,
+            "max_input_length": config.MAX_INPUT_LENGTH,
+            "max_tokens": config.MAX_TOKENS,
+            "num_beams": config.NUM_BEAMS,
+            "quantization": config.QUANTIZATION,
+            "use_onnx": config.USE_ONNX,
+        }
+
+    def _load_baseline(
+        self, baseline_file: Path, fingerprint: Dict[str, Any]
+    ) -> Optional[AggregateEvaluationResults]:
+        """Load cached baseline results if they were produced with the same inputs"""
+        from .evaluator import AggregateEvaluationResults
+
+        try:
+            data = load_json(baseline_file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable baseline {baseline_file}: {str(e)}")
+            return None
+
+        if data.get("fingerprint") != fingerprint:
+            logger.info(f"Baseline inputs changed, re-running: {baseline_file}")
+            return None
+
+        try:
+            return AggregateEvaluationResults(**data["results"])
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable baseline {baseline_file}: {str(e)}")
+            return None
+
+    def _warm_model_cache(self, model_names: List[str]) -> None:
+        """Fetch model checkpoints into the local cache before forking workers"""
+        from src.nlp.generator import prefetch_model
+
+        for model_name in dict.fromkeys(m or config.MODEL_NAME for m in model_names):
+            try:
+                prefetch_model(model_name)
+            except Exception as e:
+                logger.warning(f"Could not warm model cache for {model_name}: {e}")
+
     def run_full_evaluation_suite(
-        self, datasets: List[str], models: List[str]
+        self, datasets: List[str], models: List[str], max_workers: Optional[int] = None
     ) -> Dict[str, Any]:
         """Run comprehensive evaluation suite"""
 
@@ -171,20 +458,38 @@ class BenchmarkRunner:
             "timestamp": datetime.now().isoformat(),
             "datasets": datasets,
             "models": models,
-            "results": {},
+            "results": {dataset: {} for dataset in datasets},
         }
 
-        for dataset in datasets:
-            logger.info(f"Evaluating dataset: {dataset}")
-            suite_results["results"][dataset] = {}
+        pairs = [(dataset, model) for dataset in datasets for model in models]
+
+        # Download each checkpoint once so workers load from local disk only
+        self._warm_model_cache(models)
+
+        # Round-robin visible GPUs across workers so they don't contend
+        max_workers, gpu_slots, cpu_threads = _worker_slots(len(pairs), max_workers)
+
+        # One task per child: each worker loads exactly one model
+        with ProcessPoolExecutor(
+            max_workers=max_workers, max_tasks_per_child=1
+        ) as executor:
+            futures = {
+                (dataset, model): executor.submit(
+                    _run_one,
+                    self.database_url,
+                    str(self.results_dir),
+                    dataset,
+                    model,
+                    gpu_slots[i % len(gpu_slots)] if gpu_slots else None,
+                    cpu_threads,
+                )
+                for i, (dataset, model) in enumerate(pairs)
+            }
 
-            for model in models:
+            for (dataset, model), future in futures.items():
                 logger.info(f"Evaluating model: {model} on {dataset}")
                 try:
-                    results = self.run_benchmark(dataset, model)
-                    suite_results["results"][dataset][model] = self._results_to_dict(
-                        results
-                    )
+                    suite_results["results"][dataset][model] = future.result()
                 except Exception as e:
                     logger.error(
                         f"Evaluation failed for {model} on {dataset}: {str(e)}"
@@ -195,34 +500,13 @@ class BenchmarkRunner:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         suite_file = self.results_dir / f"evaluation_suite_{timestamp}.json"
 
-        with open(suite_file, "w", encoding="utf-8") as f:
-            json.dump(suite_results, f, indent=2, ensure_ascii=False)
+        # Compact output is much faster for large suites; pretty-print when debugging
+        dump_json(suite_results, suite_file, indent=config.DEBUG)
 
         logger.info(f"Evaluation suite completed. Results saved: {suite_file}")
 
         return suite_results
 
-    def _results_to_dict(self, results: AggregateEvaluationResults) -> Dict[str, Any]:
-        """Convert results to dictionary for JSON serialization"""
-        return {
-            "dataset_name": results.dataset_name,
-            "total_questions": results.total_questions,
-            "successful_generations": results.successful_generations,
-            "successful_executions": results.successful_executions,
-            "avg_exact_match": results.avg_exact_match,
-            "avg_precision": results.avg_precision,
-            "avg_recall": results.avg_recall,
-            "avg_f1_score": results.avg_f1_score,
-            "execution_success_rate": results.execution_success_rate,
-            "avg_execution_time": results.avg_execution_time,
-            "avg_result_accuracy": results.avg_result_accuracy,
-            "component_scores": results.component_scores,
-            "avg_generation_time": results.avg_generation_time,
-            "total_evaluation_time": results.total_evaluation_time,
-            "error_types": results.error_types,
-            "failed_questions": results.failed_questions,
-        }
-
     def list_available_datasets(self) -> Dict[str, List[str]]:
         """List available datasets for benchmarking"""
         return self.dataset_loader.list_available_datasets()
@@ -230,39 +514,13 @@ class BenchmarkRunner:
     def get_benchmark_summary(self) -> Dict[str, Any]:
         """Get summary of all benchmark results"""
 
-        if not self.results_dir.exists():
+        try:
+            mtime_ns = os.stat(self.results_dir).st_mtime_ns
+        except OSError:
             return {"message": "No benchmark results found"}
 
-        # Find all result files
-        result_files = list(self.results_dir.glob("evaluation_*.json"))
-
-        if not result_files:
-            return {"message": "No evaluation files found"}
-
-        summary = {
-            "total_benchmarks": len(result_files),
-            "latest_benchmark": max(result_files, key=lambda x: x.stat().st_mtime).name,
-            "benchmarks": [],
-        }
-
-        for result_file in result_files:
-            try:
-                with open(result_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-
-                summary["benchmarks"].append(
-                    {
-                        "file": result_file.name,
-                        "dataset": data.get("dataset_name", "Unknown"),
-                        "f1_score": data.get("avg_f1_score", 0),
-                        "execution_success_rate": data.get("execution_success_rate", 0),
-                        "total_questions": data.get("total_questions", 0),
-                    }
-                )
-            except Exception as e:
-                logger.warning(f"Could not read result file {result_file}: {str(e)}")
-
-        return summary
+        # Copy so callers can't mutate the cached summary
+        return copy.deepcopy(_summarize_results(self.results_dir, mtime_ns))
 
 
 def main():
@@ -304,6 +562,8 @@ def main():
 
     args = parser.parse_args()
 
+    configure()
+
     # Initialize benchmark runner
     runner = BenchmarkRunner()
 
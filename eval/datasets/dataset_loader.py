@@ -7,14 +7,52 @@ Supports loading various Text-to-SQL datasets including:
 - WikiSQL dataset format
 """
 
-import json
 import os
-from typing import Dict, List, Any, Optional
+import pickle
+import functools
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 
-@dataclass
+from src.utils.json_io import dump_json, load_json
+
+try:
+    import ijson
+except ImportError:  # Optional: fall back to a whole-file parse
+    ijson = None
+
+# Top-level dataset keys kept alongside the streamed questions
+_HEADER_KEYS = ("dataset_name", "version", "description", "schema")
+
+# Dataset source directories scanned by list_available_datasets
+_SOURCE_DIRS = ("custom", "spider", "wikisql")
+
+
+def _dir_mtime_ns(path: Path) -> Optional[int]:
+    """Return a directory's mtime in nanoseconds, or None if it is missing"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=32)
+def _list_json_files(
+    datasets_dir: Path, mtimes: Tuple[Optional[int], ...]
+) -> Dict[str, Tuple[str, ...]]:
+    """Glob dataset files; cached until one of the source directories changes"""
+    datasets = {}
+    for source, mtime_ns in zip(_SOURCE_DIRS, mtimes):
+        if mtime_ns is not None:
+            source_dir = datasets_dir / source
+            datasets[source] = tuple(f.name for f in source_dir.glob("*.json"))
+    return datasets
+
+
+@dataclass(slots=True, frozen=True)
 class Question:
     """Container for a single evaluation question"""
 
@@ -23,11 +61,11 @@ class Question:
     sql: str
     expected_result_count: Optional[int] = None
     difficulty: Optional[str] = None
-    tags: Optional[List[str]] = None
+    tags: Optional[Tuple[str, ...]] = None
     schema: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Dataset:
     """Container for evaluation dataset"""
 
@@ -52,32 +90,83 @@ class DatasetLoader:
         if not dataset_path.exists():
             raise FileNotFoundError(f"Dataset file not found: {dataset_path}")
 
-        with open(dataset_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        # Convert questions to Question objects
-        questions = []
-        for q_data in data.get("questions", []):
-            question = Question(
-                id=q_data.get("id", ""),
-                question=q_data.get("question", ""),
-                sql=q_data.get("sql", ""),
-                expected_result_count=q_data.get("expected_result_count"),
-                difficulty=q_data.get("difficulty"),
-                tags=q_data.get("tags", []),
-                schema=q_data.get("schema"),
-            )
-            questions.append(question)
-
-        return Dataset(
-            name=data.get("dataset_name", "Unknown"),
-            version=data.get("version", "1.0.0"),
-            description=data.get("description", ""),
-            schema=data.get("schema", {}),
+        # Reuse the pickled Dataset while it is newer than the JSON source
+        cache_path = dataset_path.with_suffix(".pkl")
+        try:
+            if cache_path.stat().st_mtime >= dataset_path.stat().st_mtime:
+                with open(cache_path, "rb") as f:
+                    return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, AttributeError, TypeError, EOFError):
+            pass
+
+        if ijson is not None:
+            with open(dataset_path, "rb") as f:
+                header, questions = self._stream_custom_dataset(f)
+        else:
+            data = load_json(dataset_path)
+            header = data
+            questions = [self._build_question(q) for q in data.get("questions", [])]
+
+        dataset = Dataset(
+            name=header.get("dataset_name", "Unknown"),
+            version=header.get("version", "1.0.0"),
+            description=header.get("description", ""),
+            schema=header.get("schema", {}),
             questions=questions,
             total_questions=len(questions),
         )
 
+        try:
+            with open(cache_path, "wb") as f:
+                pickle.dump(dataset, f, protocol=5)
+        except OSError:
+            pass  # Read-only dataset directory; parse again next time
+
+        return dataset
+
+    def _stream_custom_dataset(self, f) -> Tuple[Dict[str, Any], List[Question]]:
+        """Incrementally parse a custom dataset, one question at a time"""
+        header: Dict[str, Any] = {}
+        questions: List[Question] = []
+        builder = None
+        building = None
+
+        for prefix, event, value in ijson.parse(f, use_float=True):
+            if builder is not None:
+                builder.event(event, value)
+                if prefix == building and event in ("end_map", "end_array"):
+                    if building == "questions.item":
+                        questions.append(self._build_question(builder.value))
+                    else:
+                        header[building] = builder.value
+                    builder = None
+                continue
+
+            if prefix != "questions.item" and prefix not in _HEADER_KEYS:
+                continue
+
+            if event in ("start_map", "start_array"):
+                builder = ijson.ObjectBuilder()
+                builder.event(event, value)
+                building = prefix
+            elif prefix in _HEADER_KEYS:
+                header[prefix] = value
+
+        return header, questions
+
+    def _build_question(self, q_data: Dict[str, Any]) -> Question:
+        """Convert a raw question record to a Question object"""
+        tags = q_data.get("tags", [])
+        return Question(
+            id=q_data.get("id", ""),
+            question=q_data.get("question", ""),
+            sql=q_data.get("sql", ""),
+            expected_result_count=q_data.get("expected_result_count"),
+            difficulty=q_data.get("difficulty"),
+            tags=tuple(tags) if tags is not None else None,
+            schema=q_data.get("schema"),
+        )
+
     def load_spider_dataset(self, dataset_dir: str) -> Dataset:
         """Load Spider dataset format"""
         # This is a placeholder for Spider dataset loading
@@ -92,27 +181,11 @@ class DatasetLoader:
 
     def list_available_datasets(self) -> Dict[str, List[str]]:
         """List all available datasets"""
-        datasets = {}
-
-        # Check custom datasets
-        custom_dir = self.datasets_dir / "custom"
-        if custom_dir.exists():
-            custom_files = [f.name for f in custom_dir.glob("*.json")]
-            datasets["custom"] = custom_files
-
-        # Check Spider datasets
-        spider_dir = self.datasets_dir / "spider"
-        if spider_dir.exists():
-            spider_files = [f.name for f in spider_dir.glob("*.json")]
-            datasets["spider"] = spider_files
-
-        # Check WikiSQL datasets
-        wikisql_dir = self.datasets_dir / "wikisql"
-        if wikisql_dir.exists():
-            wikisql_files = [f.name for f in wikisql_dir.glob("*.json")]
-            datasets["wikisql"] = wikisql_files
-
-        return datasets
+        mtimes = tuple(
+            _dir_mtime_ns(self.datasets_dir / source) for source in _SOURCE_DIRS
+        )
+        cached = _list_json_files(self.datasets_dir, mtimes)
+        return {source: list(files) for source, files in cached.items()}
 
     def filter_dataset_by_difficulty(
         self, dataset: Dataset, difficulty: str
@@ -133,10 +206,9 @@ class DatasetLoader:
 
     def filter_dataset_by_tags(self, dataset: Dataset, tags: List[str]) -> Dataset:
         """Filter dataset by tags"""
+        tag_set = frozenset(tags)
         filtered_questions = [
-            q
-            for q in dataset.questions
-            if q.tags and any(tag in q.tags for tag in tags)
+            q for q in dataset.questions if q.tags and not tag_set.isdisjoint(q.tags)
         ]
 
         return Dataset(
@@ -161,27 +233,28 @@ class DatasetLoader:
         if not dataset.questions:
             return stats
 
-        # Calculate difficulty distribution
+        # Difficulty and tag distributions in a single pass
+        difficulty_counts = Counter()
+        tag_counts = Counter()
         for question in dataset.questions:
             if question.difficulty:
-                stats["difficulty_distribution"][question.difficulty] = (
-                    stats["difficulty_distribution"].get(question.difficulty, 0) + 1
-                )
-
-        # Calculate tag distribution
-        for question in dataset.questions:
+                difficulty_counts[question.difficulty] += 1
             if question.tags:
-                for tag in question.tags:
-                    stats["tag_distribution"][tag] = (
-                        stats["tag_distribution"].get(tag, 0) + 1
-                    )
+                tag_counts.update(question.tags)
 
-        # Calculate average lengths
-        question_lengths = [len(q.question) for q in dataset.questions]
-        sql_lengths = [len(q.sql) for q in dataset.questions]
+        n = len(dataset.questions)
+        stats["difficulty_distribution"] = dict(difficulty_counts)
+        stats["tag_distribution"] = dict(tag_counts)
 
-        stats["avg_question_length"] = sum(question_lengths) / len(question_lengths)
-        stats["avg_sql_length"] = sum(sql_lengths) / len(sql_lengths)
+        # Average lengths over contiguous int32 arrays
+        question_lengths = np.fromiter(
+            (len(q.question) for q in dataset.questions), dtype=np.int32, count=n
+        )
+        sql_lengths = np.fromiter(
+            (len(q.sql) for q in dataset.questions), dtype=np.int32, count=n
+        )
+        stats["avg_question_length"] = float(question_lengths.mean())
+        stats["avg_sql_length"] = float(sql_lengths.mean())
 
         return stats
 
@@ -214,7 +287,6 @@ class DatasetLoader:
             ],
         }
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        dump_json(data, output_path)
 
         print(f"Dataset saved to: {output_path}")
@@ -9,27 +9,44 @@ Orchestrates the evaluation process including:
 - Generating reports
 """
 
+from __future__ import annotations
+
 import time
-import json
-from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
+import threading
+from collections import OrderedDict
+from contextlib import ExitStack
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Dict, Iterator, List, Any, Optional, Tuple
+from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import StaticPool
 
-from src.nlp.generator import T2SQLGenerator
+from config.config import config
+from src.db.connect import tune_sqlite_engine
 from src.db.introspect import get_schema_summary, to_compact_schema
 from .datasets.dataset_loader import DatasetLoader, Dataset, Question
 from .metrics.sql_metrics import SQLMetricsCalculator, SQLMetrics
 from .metrics.execution_metrics import ExecutionMetricsCalculator, ExecutionMetrics
 from .metrics.component_metrics import ComponentMetricsCalculator, ComponentMetrics
+from .metrics._aggregate import masked_mean
+from src.utils.hashing import cache_key_hash
+from src.utils.json_io import dump_json, json_line
 from src.utils.logger import get_logger
 
+if TYPE_CHECKING:
+    from src.nlp.generator import T2SQLGenerator
+
 logger = get_logger("text2sql.evaluator")
 
+# Maximum number of generated SQL predictions kept in memory
+_PREDICTION_CACHE_SIZE = 4096
 
-@dataclass
+
+@dataclass(slots=True)
 class EvaluationResult:
     """Container for evaluation results"""
 
@@ -44,7 +61,7 @@ class EvaluationResult:
     total_time: float
 
 
-@dataclass
+@dataclass(slots=True)
 class AggregateEvaluationResults:
     """Container for aggregate evaluation results"""
 
@@ -76,12 +93,103 @@ class AggregateEvaluationResults:
     failed_questions: List[str]
 
 
+# Scalar per-question metrics, in the order they are stored and averaged
+_METRIC_COLUMNS = (
+    "exact_match",
+    "precision",
+    "recall",
+    "f1_score",
+    "execution_success",
+    "execution_time",
+    "result_accuracy",
+    "generation_time",
+)
+
+
+class QuestionResultsSoA:
+    """Per-question metrics stored column-wise for vectorized aggregation"""
+
+    __slots__ = ("metrics", "syntax_valid", "recorded", "components", "comp_scores")
+
+    def __init__(self, n: int):
+        # One row per question; rows stay unrecorded for failed questions
+        self.metrics = np.zeros((n, len(_METRIC_COLUMNS)), dtype=np.float64)
+        self.syntax_valid = np.zeros(n, dtype=np.bool_)
+        self.recorded = np.zeros(n, dtype=np.bool_)
+
+        # (n, components, [precision, recall, f1]), sized on the first record
+        self.components: Optional[List[str]] = None
+        self.comp_scores: Optional[np.ndarray] = None
+
+    def record(self, i: int, result: EvaluationResult) -> None:
+        """Store one question's metrics in row i"""
+        sm = result.sql_metrics
+        em = result.execution_metrics
+        self.metrics[i] = (
+            sm.exact_match,
+            sm.precision,
+            sm.recall,
+            sm.f1_score,
+            em.success,
+            em.execution_time,
+            em.result_accuracy,
+            result.generation_time,
+        )
+        self.syntax_valid[i] = sm.syntax_valid
+        self.recorded[i] = True
+
+        components = result.component_metrics.components
+        if self.components is None:
+            self.components = list(components)
+            self.comp_scores = np.zeros(
+                (len(self.metrics), len(components), 3), dtype=np.float64
+            )
+        self.comp_scores[i] = [
+            (a.precision, a.recall, a.f1_score)
+            for a in map(components.__getitem__, self.components)
+        ]
+
+
 class Text2SQLEvaluator:
     """Main evaluator for Text-to-SQL generation"""
 
-    def __init__(self, database_url: str = "sqlite:///data/demo.sqlite"):
+    def __init__(
+        self,
+        database_url: str = "sqlite:///data/demo.sqlite",
+        pool_size: int = 16,
+        max_overflow: int = 16,
+    ):
         self.database_url = database_url
-        self.engine = create_engine(database_url, future=True)
+
+        # Size the pool for concurrent question evaluation
+        engine_kwargs: Dict[str, Any] = {"future": True, "pool_pre_ping": True}
+        url = make_url(database_url)
+        if url.get_backend_name() == "sqlite":
+            engine_kwargs["connect_args"] = {"check_same_thread": False}
+        if url.get_backend_name() == "sqlite" and url.database in (
+            None,
+            "",
+            ":memory:",
+        ):
+            # Every new connection would see a fresh in-memory database
+            engine_kwargs["poolclass"] = StaticPool
+        else:
+            engine_kwargs.update(
+                pool_size=pool_size, max_overflow=max_overflow, pool_recycle=1800
+            )
+        self.engine = tune_sqlite_engine(create_engine(database_url, **engine_kwargs))
+
+        # T2SQLGenerator is a shared singleton; serialize direct generate calls
+        self._generate_lock = threading.Lock()
+
+        # LRU cache of generated SQL keyed by model, schema and question
+        self._pred_cache: OrderedDict[Tuple[str, int, str], str] = OrderedDict()
+        self._pred_cache_lock = threading.Lock()
+        # Set by _get_schema together with the introspected schema
+        self._schema_hash = 0
+
+        # Introspected schema, invariant for the lifetime of the evaluator
+        self._schema_cache: Optional[Tuple[str, list, list]] = None
 
         # Initialize metric calculators
         self.sql_calculator = SQLMetricsCalculator()
@@ -93,25 +201,77 @@ class Text2SQLEvaluator:
 
         logger.info(f"Initialized Text2SQL Evaluator with database: {database_url}")
 
+    def _get_schema(self) -> Tuple[str, list, list]:
+        """Introspect the database schema once and reuse it across runs"""
+        if self._schema_cache is None:
+            tables, cols = get_schema_summary(self.engine)
+            schema_txt = to_compact_schema(tables, cols)
+            self._schema_cache = (schema_txt, tables, cols)
+            self._schema_hash = cache_key_hash(schema_txt)
+        return self._schema_cache
+
+    def _prediction_key(
+        self, question_text: str, model: T2SQLGenerator
+    ) -> Tuple[str, int, str]:
+        """Cache key for a question's generated SQL"""
+        # Introspect first so no entry is stored under the placeholder hash
+        self._get_schema()
+        # A plain tuple: the dict hashes it without re-hashing the joined text.
+        # Case is kept: 'Alice' and 'alice' in a question can need different SQL
+        return (model.model_name, self._schema_hash, question_text.strip())
+
+    def _get_cached_prediction(self, key: Tuple[str, int, str]) -> Optional[str]:
+        """Return cached SQL for a prediction key, if any"""
+        with self._pred_cache_lock:
+            sql = self._pred_cache.get(key)
+            if sql is not None:
+                self._pred_cache.move_to_end(key)
+            return sql
+
+    def _cache_prediction(self, key: Tuple[str, int, str], sql: str) -> None:
+        """Store generated SQL, evicting the least recently used entry"""
+        with self._pred_cache_lock:
+            self._pred_cache[key] = sql
+            self._pred_cache.move_to_end(key)
+            if len(self._pred_cache) > _PREDICTION_CACHE_SIZE:
+                self._pred_cache.popitem(last=False)
+
     def evaluate_question(
-        self, question: Question, model: T2SQLGenerator
+        self,
+        question: Question,
+        model: T2SQLGenerator,
+        prediction: Optional[Tuple[str, float]] = None,
     ) -> EvaluationResult:
-        """Evaluate a single question"""
+        """Evaluate a single question, optionally reusing a batched prediction"""
         start_time = time.time()
 
         logger.info(f"Evaluating question: {question.id}")
 
         # Generate SQL
-        generation_start = time.time()
-        try:
-            predicted_sql = model.generate(question.question)
-            generation_time = time.time() - generation_start
+        if prediction is not None:
+            predicted_sql, generation_time = prediction
             generation_success = True
-        except Exception as e:
-            logger.error(f"SQL generation failed for {question.id}: {str(e)}")
-            predicted_sql = ""
-            generation_time = time.time() - generation_start
-            generation_success = False
+        else:
+            key = self._prediction_key(question.question, model)
+            cached_sql = self._get_cached_prediction(key)
+            generation_start = time.time()
+            try:
+                if cached_sql is not None:
+                    predicted_sql, generation_time = cached_sql, 0.0
+                else:
+                    with self._generate_lock:
+                        generation_start = time.time()
+                        predicted_sql = model.generate(
+                            question.question, schema_txt=self._get_schema()[0]
+                        )
+                        generation_time = time.time() - generation_start
+                    self._cache_prediction(key, predicted_sql)
+                generation_success = True
+            except Exception as e:
+                logger.error(f"SQL generation failed for {question.id}: {str(e)}")
+                predicted_sql = ""
+                generation_time = time.time() - generation_start
+                generation_success = False
 
         # Calculate SQL metrics
         sql_metrics = self.sql_calculator.evaluate_sql(
@@ -154,70 +314,225 @@ class Text2SQLEvaluator:
             total_time=total_time,
         )
 
+    def _generate_predictions(
+        self, questions: List[Question], model: T2SQLGenerator, batch_size: int
+    ) -> List[Optional[Tuple[str, float]]]:
+        """
+        Generate SQL for all questions in padded batches
+
+        Questions are sorted by token length so each batch pads to similar
+        sizes, and the batch size is halved whenever the GPU runs out of memory.
+        Entries are returned in the original question order; None marks a
+        question whose batch failed, so it falls back to single-question
+        generation. Cached predictions are reused with zero generation time.
+        """
+        import torch
+
+        oom_error = getattr(torch.cuda, "OutOfMemoryError", RuntimeError)
+
+        keys = [self._prediction_key(q.question, model) for q in questions]
+        predictions: List[Optional[Tuple[str, float]]] = [None] * len(questions)
+        pending = []
+        for i, key in enumerate(keys):
+            cached_sql = self._get_cached_prediction(key)
+            if cached_sql is not None:
+                predictions[i] = (cached_sql, 0.0)
+            else:
+                pending.append(i)
+
+        if not pending:
+            return predictions
+
+        # Length bucketing: the prompt prefix is shared, so the question's token
+        # count decides how much padding a batch needs
+        token_ids = model.tok(
+            [questions[i].question for i in pending], add_special_tokens=False
+        ).input_ids
+        lengths = np.fromiter(map(len, token_ids), dtype=np.int32, count=len(pending))
+        order = [pending[j] for j in np.argsort(lengths, kind="stable").tolist()]
+
+        start = 0
+        while start < len(order):
+            batch = order[start : start + batch_size]
+            batch_start = time.time()
+            try:
+                sqls = model.generate_batch(
+                    [questions[i].question for i in batch],
+                    schema_txt=self._get_schema()[0],
+                )
+            except Exception as e:
+                if isinstance(e, oom_error) and batch_size > 1:
+                    torch.cuda.empty_cache()
+                    batch_size //= 2
+                    logger.warning(
+                        f"Out of memory, retrying with batch size {batch_size}"
+                    )
+                    continue
+                logger.error(f"Batch generation failed: {str(e)}")
+                start += len(batch)
+                continue
+
+            # Attribute the batch latency evenly across its questions
+            per_question = (time.time() - batch_start) / len(batch)
+            for i, sql in zip(batch, sqls):
+                predictions[i] = (sql, per_question)
+                self._cache_prediction(keys[i], sql)
+            start += len(batch)
+
+        return predictions
+
     def evaluate_dataset(
-        self, dataset: Dataset, model_name: Optional[str] = None
+        self,
+        dataset: Dataset,
+        model_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_workers: int = 8,
+        stream_path: Optional[str] = None,
     ) -> AggregateEvaluationResults:
-        """Evaluate entire dataset"""
-        logger.info(f"Starting evaluation of dataset: {dataset.name}")
-        logger.info(f"Total questions: {dataset.total_questions}")
+        """
+        Evaluate entire dataset
 
+        When stream_path is given, each question's EvaluationResult is appended
+        there as a JSON Lines record as soon as it completes, after a leading
+        {"_meta": ...} record, so partial runs are not lost.
+        """
         start_time = time.time()
+        model = self._load_model(model_name)
 
-        # Get schema for model initialization
-        tables, cols = get_schema_summary(self.engine)
-        schema_txt = to_compact_schema(tables, cols)
+        # Only the metric columns are kept, in dataset order for reports
+        columns = QuestionResultsSoA(len(dataset.questions))
 
-        # Initialize model
-        model = T2SQLGenerator(schema_txt=schema_txt, model_name=model_name)
+        with ExitStack() as stack:
+            stream = (
+                stack.enter_context(open(stream_path, "ab")) if stream_path else None
+            )
+            if stream is not None:
+                meta = {
+                    "dataset_name": dataset.name,
+                    "model_name": model.model_name,
+                    "total_questions": dataset.total_questions,
+                }
+                stream.write(json_line({"_meta": meta}))
 
-        # Evaluate each question
-        results = []
-        failed_questions = []
-        error_types = {}
+            for i, result in self._iter_results(
+                dataset, model, batch_size, max_workers
+            ):
+                if result is None:
+                    continue
 
-        for i, question in enumerate(dataset.questions):
-            logger.info(
-                f"Processing question {i + 1}/{dataset.total_questions}: {question.id}"
-            )
+                columns.record(i, result)
+                if stream is not None:
+                    stream.write(json_line(result))
+                    stream.flush()
 
-            try:
-                result = self.evaluate_question(question, model)
-                results.append(result)
-
-                # Track errors
-                if not result.sql_metrics.syntax_valid:
-                    error_types["syntax_error"] = error_types.get("syntax_error", 0) + 1
-                if not result.execution_metrics.success:
-                    error_types["execution_error"] = (
-                        error_types.get("execution_error", 0) + 1
-                    )
+        return self.build_aggregate_results(dataset, columns, time.time() - start_time)
 
-            except Exception as e:
-                logger.error(f"Evaluation failed for {question.id}: {str(e)}")
-                failed_questions.append(question.id)
-                error_types["evaluation_error"] = (
-                    error_types.get("evaluation_error", 0) + 1
+    def evaluate_dataset_iter(
+        self,
+        dataset: Dataset,
+        model_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_workers: int = 8,
+    ) -> Iterator[Tuple[int, Optional[EvaluationResult]]]:
+        """
+        Evaluate a dataset, yielding (question index, result) as each completes
+
+        Results arrive in completion order; the result is None for questions
+        whose evaluation failed. Record the results in a QuestionResultsSoA
+        and pass it to build_aggregate_results for the summary.
+        """
+        model = self._load_model(model_name)
+        yield from self._iter_results(dataset, model, batch_size, max_workers)
+
+    def _load_model(self, model_name: Optional[str]) -> T2SQLGenerator:
+        """Initialize the generator with the database schema"""
+        schema_txt, _, _ = self._get_schema()
+
+        # Imported here to keep torch off the import path
+        from src.nlp.generator import T2SQLGenerator
+
+        return T2SQLGenerator(schema_txt=schema_txt, model_name=model_name)
+
+    def _iter_results(
+        self,
+        dataset: Dataset,
+        model: T2SQLGenerator,
+        batch_size: Optional[int],
+        max_workers: int,
+    ) -> Iterator[Tuple[int, Optional[EvaluationResult]]]:
+        """Generate predictions, then score and execute them concurrently"""
+        logger.info(f"Starting evaluation of dataset: {dataset.name}")
+        logger.info(f"Total questions: {dataset.total_questions}")
+
+        # Generate all predictions up front in batches
+        predictions = self._generate_predictions(
+            dataset.questions, model, batch_size or config.GENERATION_BATCH_SIZE
+        )
+
+        # Scoring and execution are IO-bound
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(
+                    self.evaluate_question, question, model, predictions[i]
+                ): i
+                for i, question in enumerate(dataset.questions)
+            }
+
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                question = dataset.questions[i]
+                logger.info(
+                    f"Processed question {done}/{dataset.total_questions}: {question.id}"
                 )
 
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Evaluation failed for {question.id}: {str(e)}")
+                    result = None
+
+                yield i, result
+
+    def build_aggregate_results(
+        self,
+        dataset: Dataset,
+        columns: QuestionResultsSoA,
+        total_time: float,
+    ) -> AggregateEvaluationResults:
+        """Summarize recorded per-question results; unrecorded rows failed"""
+        recorded = columns.recorded
+        failed_questions = [dataset.questions[i].id for i in np.flatnonzero(~recorded)]
+
+        # Count errors with vectorized reductions over the recorded rows
+        success = columns.metrics[:, _METRIC_COLUMNS.index("execution_success")]
+        error_counts = {
+            "evaluation_error": len(failed_questions),
+            "syntax_error": int((recorded & ~columns.syntax_valid).sum()),
+            "execution_error": int((recorded & (success == 0)).sum()),
+        }
+        error_types = {key: count for key, count in error_counts.items() if count}
+
         # Calculate aggregate results
         aggregate_results = self._calculate_aggregate_results(
-            dataset, results, failed_questions, error_types, time.time() - start_time
+            dataset, columns, failed_questions, error_types, total_time
         )
 
-        logger.info(f"Evaluation completed in {time.time() - start_time:.2f} seconds")
+        logger.info(f"Evaluation completed in {total_time:.2f} seconds")
         return aggregate_results
 
     def _calculate_aggregate_results(
         self,
         dataset: Dataset,
-        results: List[EvaluationResult],
+        columns: QuestionResultsSoA,
         failed_questions: List[str],
         error_types: Dict[str, int],
         total_time: float,
     ) -> AggregateEvaluationResults:
-        """Calculate aggregate results from individual evaluations"""
+        """Calculate aggregate results from the per-question metric columns"""
+        recorded = columns.recorded
+        n = int(recorded.sum())
 
-        if not results:
+        if not n:
             return AggregateEvaluationResults(
                 dataset_name=dataset.name,
                 total_questions=dataset.total_questions,
@@ -237,62 +552,33 @@ class Text2SQLEvaluator:
                 failed_questions=failed_questions,
             )
 
-        # Calculate averages
-        avg_exact_match = sum(r.sql_metrics.exact_match for r in results) / len(results)
-        avg_precision = sum(r.sql_metrics.precision for r in results) / len(results)
-        avg_recall = sum(r.sql_metrics.recall for r in results) / len(results)
-        avg_f1_score = sum(r.sql_metrics.f1_score for r in results) / len(results)
-
-        # Execution metrics
-        successful_executions = sum(1 for r in results if r.execution_metrics.success)
-        execution_success_rate = successful_executions / len(results)
-        avg_execution_time = sum(
-            r.execution_metrics.execution_time for r in results
-        ) / len(results)
-        avg_result_accuracy = sum(
-            r.execution_metrics.result_accuracy for r in results
-        ) / len(results)
-
-        # Performance metrics
-        avg_generation_time = sum(r.generation_time for r in results) / len(results)
+        means = dict(
+            zip(_METRIC_COLUMNS, masked_mean(columns.metrics, recorded).tolist())
+        )
+        success = columns.metrics[:, _METRIC_COLUMNS.index("execution_success")]
+        successful_executions = int(success[recorded].sum())
 
         # Component scores (average across all results)
-        component_scores = {}
-        if results:
-            first_result = results[0]
-            for component_type in first_result.component_metrics.components:
-                component_scores[component_type] = {
-                    "precision": sum(
-                        r.component_metrics.components[component_type].precision
-                        for r in results
-                    )
-                    / len(results),
-                    "recall": sum(
-                        r.component_metrics.components[component_type].recall
-                        for r in results
-                    )
-                    / len(results),
-                    "f1_score": sum(
-                        r.component_metrics.components[component_type].f1_score
-                        for r in results
-                    )
-                    / len(results),
-                }
+        comp_means = masked_mean(columns.comp_scores, recorded).tolist()
+        component_scores = {
+            component_type: dict(zip(("precision", "recall", "f1_score"), scores))
+            for component_type, scores in zip(columns.components, comp_means)
+        }
 
         return AggregateEvaluationResults(
             dataset_name=dataset.name,
             total_questions=dataset.total_questions,
-            successful_generations=len(results),
+            successful_generations=n,
             successful_executions=successful_executions,
-            avg_exact_match=avg_exact_match,
-            avg_precision=avg_precision,
-            avg_recall=avg_recall,
-            avg_f1_score=avg_f1_score,
-            execution_success_rate=execution_success_rate,
-            avg_execution_time=avg_execution_time,
-            avg_result_accuracy=avg_result_accuracy,
+            avg_exact_match=means["exact_match"],
+            avg_precision=means["precision"],
+            avg_recall=means["recall"],
+            avg_f1_score=means["f1_score"],
+            execution_success_rate=means["execution_success"],
+            avg_execution_time=means["execution_time"],
+            avg_result_accuracy=means["result_accuracy"],
             component_scores=component_scores,
-            avg_generation_time=avg_generation_time,
+            avg_generation_time=means["generation_time"],
             total_evaluation_time=total_time,
             error_types=error_types,
             failed_questions=failed_questions,
@@ -312,12 +598,8 @@ class Text2SQLEvaluator:
         filename = f"evaluation_{results.dataset_name}_{timestamp}.json"
         filepath = output_path / filename
 
-        # Convert results to dictionary
-        results_dict = asdict(results)
-
-        # Save to JSON
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(results_dict, f, indent=2, ensure_ascii=False)
+        # Serialized directly from the dataclass, without an asdict() deep copy
+        dump_json(results, filepath)
 
         logger.info(f"Results saved to: {filepath}")
         return filepath
@@ -0,0 +1,147 @@
+"""
+Numeric kernels for batched component scoring and result aggregation
+
+Uses Numba when it is installed and falls back to NumPy otherwise.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Optional: fall back to the NumPy implementation
+    njit = None
+
+
+def _f1(precision: np.ndarray, recall: np.ndarray) -> np.ndarray:
+    """Elementwise F1 score, 0.0 where precision and recall are both 0"""
+    total = precision + recall
+    return np.divide(
+        2 * precision * recall, total, out=np.zeros_like(total), where=total > 0
+    )
+
+
+def _score_counts_numpy(
+    tp: np.ndarray, pred_len: np.ndarray, gt_len: np.ndarray, weights: np.ndarray
+) -> Tuple[np.ndarray, ...]:
+    """NumPy implementation of score_counts"""
+    precision = np.divide(tp, pred_len, out=np.zeros_like(tp), where=pred_len > 0)
+    recall = np.divide(tp, gt_len, out=np.zeros_like(tp), where=gt_len > 0)
+
+    # A component absent from both queries is a perfect match
+    both_empty = (pred_len == 0) & (gt_len == 0)
+    precision[both_empty] = 1.0
+    recall[both_empty] = 1.0
+
+    norm = weights / weights.sum()
+    # Row sums rather than a matmul keep results identical for any batch size
+    overall_precision = (precision * norm).sum(axis=-1)
+    overall_recall = (recall * norm).sum(axis=-1)
+
+    return (
+        precision,
+        recall,
+        _f1(precision, recall),
+        overall_precision,
+        overall_recall,
+        _f1(overall_precision, overall_recall),
+    )
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _f1_scalar(precision, recall):
+        total = precision + recall
+        if total > 0:
+            return 2 * precision * recall / total
+        return 0.0
+
+    @njit(parallel=True, cache=True)
+    def _score_counts_numba(tp, pred_len, gt_len, weights):
+        n, c = tp.shape
+        precision = np.zeros((n, c))
+        recall = np.zeros((n, c))
+        f1 = np.zeros((n, c))
+        overall_precision = np.zeros(n)
+        overall_recall = np.zeros(n)
+        overall_f1 = np.zeros(n)
+        norm = weights / weights.sum()
+
+        for i in prange(n):
+            p_sum = 0.0
+            r_sum = 0.0
+            for j in range(c):
+                if pred_len[i, j] == 0 and gt_len[i, j] == 0:
+                    p, r = 1.0, 1.0
+                else:
+                    p = tp[i, j] / pred_len[i, j] if pred_len[i, j] > 0 else 0.0
+                    r = tp[i, j] / gt_len[i, j] if gt_len[i, j] > 0 else 0.0
+                precision[i, j] = p
+                recall[i, j] = r
+                f1[i, j] = _f1_scalar(p, r)
+                p_sum += p * norm[j]
+                r_sum += r * norm[j]
+            overall_precision[i] = p_sum
+            overall_recall[i] = r_sum
+            overall_f1[i] = _f1_scalar(p_sum, r_sum)
+
+        return precision, recall, f1, overall_precision, overall_recall, overall_f1
+
+    @njit(parallel=True, cache=True)
+    def _masked_mean_numba(values, mask):
+        n, k = values.shape
+        count = 0
+        for i in range(n):
+            if mask[i]:
+                count += 1
+
+        out = np.zeros(k)
+        for j in prange(k):
+            total = 0.0
+            for i in range(n):
+                if mask[i]:
+                    total += values[i, j]
+            out[j] = total / count
+        return out
+
+
+def masked_mean(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """
+    Mean over the rows of values selected by mask
+
+    Args:
+        values: (N, ...) array of per-question values
+        mask: (N,) boolean array of rows to include; at least one must be set
+
+    Returns:
+        Array of shape values.shape[1:]
+    """
+    if njit is not None:
+        flat = np.ascontiguousarray(values, dtype=np.float64).reshape(len(values), -1)
+        return _masked_mean_numba(flat, mask).reshape(values.shape[1:])
+    return values[mask].mean(axis=0)
+
+
+def score_counts(counts: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Score raw component counts for a batch of query pairs
+
+    Args:
+        counts: (N, C, 3) array of (true positives, predicted, ground truth) sizes
+        weights: (C,) component weights
+
+    Returns:
+        Per-component precision, recall and F1 of shape (N, C), followed by
+        the weighted overall precision, recall and F1 of shape (N,)
+    """
+    tp, pred_len, gt_len = np.moveaxis(counts.astype(np.float64), -1, 0)
+    if njit is not None:
+        return _score_counts_numba(
+            np.ascontiguousarray(tp),
+            np.ascontiguousarray(pred_len),
+            np.ascontiguousarray(gt_len),
+            weights.astype(np.float64),
+        )
+    return _score_counts_numpy(tp, pred_len, gt_len, weights)
@@ -10,13 +10,90 @@ Provides detailed analysis of SQL query components including:
 """
 
 import re
-import sqlparse
-from typing import Dict, List, Set, Tuple, Any
+import functools
+from typing import AbstractSet, Dict, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass
 from collections import defaultdict
 
-
-@dataclass
+# Clause and token patterns, compiled once at import
+_RE_SELECT = re.compile(
+    r"select\s+(.*?)(?:\s+from|\s+where|\s+group|\s+order|\s+having|$)", re.IGNORECASE
+)
+_RE_WHERE = re.compile(r"where\s+(.*?)(?:\s+group|\s+order|\s+having|$)", re.IGNORECASE)
+_RE_JOIN = re.compile(
+    r"join\s+(\w+)(?:\s+on\s+([^join]*?))?(?=\s+join|\s+where|\s+group|\s+order|\s+having|$)",
+    re.IGNORECASE,
+)
+_RE_GROUP = re.compile(r"group\s+by\s+(.*?)(?:\s+having|\s+order|$)", re.IGNORECASE)
+_RE_ORDER = re.compile(r"order\s+by\s+(.*?)(?:\s+limit|$)", re.IGNORECASE)
+_RE_AGG = re.compile(r"\b(count|sum|avg|min|max|distinct)\s*\([^)]*\)", re.IGNORECASE)
+_RE_AS = re.compile(r"\s+as\s+\w+", re.IGNORECASE)
+_RE_AGG_STRIP = re.compile(r"\w+\s*\([^)]*\)")
+_RE_ANDOR = re.compile(r"\s+and\s+|\s+or\s+", re.IGNORECASE)
+_RE_EQ = re.compile(r"\s*=\s*")
+_RE_GT = re.compile(r"\s*>\s*")
+_RE_LT = re.compile(r"\s*<\s*")
+_RE_LIKE = re.compile(r"\s*like\s+", re.IGNORECASE)
+_RE_ASCDESC = re.compile(r"\s+(asc|desc)", re.IGNORECASE)
+
+# Top-level keywords that close the clause currently being collected
+_CLAUSE_END_KEYWORDS = frozenset(
+    {"FROM", "HAVING", "LIMIT", "OFFSET", "UNION", "UNION ALL", "EXCEPT", "INTERSECT"}
+)
+
+
+def _split_select_clause(select_clause: str) -> List[str]:
+    """Split a SELECT clause into comparable column expressions"""
+    columns = []
+    for col in select_clause.split(","):
+        col = col.strip()
+        # Remove aliases (AS keyword)
+        col = _RE_AS.sub("", col)
+        # Remove aggregate functions for column comparison
+        col = _RE_AGG_STRIP.sub("AGG_FUNC", col)
+        columns.append(col)
+    return columns
+
+
+def _split_where_clause(where_clause: str) -> List[str]:
+    """Split a WHERE clause into normalized conditions"""
+    conditions = []
+    for condition in _RE_ANDOR.split(where_clause):
+        condition = condition.strip()
+        # Normalize operators
+        condition = _RE_EQ.sub(" = ", condition)
+        condition = _RE_GT.sub(" > ", condition)
+        condition = _RE_LT.sub(" < ", condition)
+        condition = _RE_LIKE.sub(" LIKE ", condition)
+        conditions.append(condition)
+    return conditions
+
+
+def _format_join(table: str, condition: str) -> str:
+    """Render a join as 'JOIN table [ON condition]'"""
+    condition = condition.strip() if condition else ""
+    return f"JOIN {table} ON {condition}" if condition else f"JOIN {table}"
+
+
+def _split_group_by_clause(group_clause: str) -> List[str]:
+    """Split a GROUP BY clause into columns"""
+    return [col.strip() for col in group_clause.split(",")]
+
+
+def _split_order_by_clause(order_clause: str) -> List[str]:
+    """Split an ORDER BY clause into columns, ignoring sort direction"""
+    # Remove ASC/DESC for comparison
+    return [_RE_ASCDESC.sub("", col.strip()) for col in order_clause.split(",")]
+
+
+def _find_aggregates(select_clause: str) -> List[str]:
+    """Find aggregate function names used in a SELECT clause"""
+    if "(" not in select_clause:
+        return []
+    return [func.lower() for func in _RE_AGG.findall(select_clause)]
+
+
+@dataclass(slots=True)
 class ComponentAnalysis:
     """Container for component-level analysis"""
 
@@ -29,7 +106,7 @@ class ComponentAnalysis:
     exact_match: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class ComponentMetrics:
     """Container for all component metrics"""
 
@@ -40,6 +117,29 @@ class ComponentMetrics:
     component_importance: Dict[str, float]
 
 
+@functools.lru_cache(maxsize=None)
+def _sqlparse():
+    """Import sqlparse on first use to keep it off the module import path"""
+    import sqlparse
+    import sqlparse.sql
+    import sqlparse.tokens
+
+    return sqlparse
+
+
+@functools.lru_cache(maxsize=8192)
+def _canonicalize_sql(sql: str) -> str:
+    """Lowercase, strip comments, collapse whitespace and drop trailing ';'"""
+    formatted = _sqlparse().format(
+        sql,
+        keyword_case="lower",
+        identifier_case="lower",
+        strip_comments=True,
+        reindent=False,
+    )
+    return " ".join(formatted.split()).rstrip(";").rstrip()
+
+
 class ComponentMetricsCalculator:
     """Calculate detailed component-level metrics for SQL queries"""
 
@@ -54,155 +154,193 @@ class ComponentMetricsCalculator:
             "aggregate_functions": 0.05,
         }
 
-    def extract_select_columns(self, sql: str) -> List[str]:
+        # Per-instance memo: ground-truth queries repeat across models and runs
+        self._extract_all_components = functools.lru_cache(maxsize=8192)(
+            self._extract_components
+        )
+
+    def extract_select_columns(
+        self, sql: str, sql_lc: Optional[str] = None
+    ) -> List[str]:
         """Extract SELECT columns from SQL query"""
+        if "select" not in (sql_lc if sql_lc is not None else sql.lower()):
+            return []
         try:
             # Use regex to extract SELECT clause
-            select_match = re.search(
-                r"select\s+(.*?)(?:\s+from|\s+where|\s+group|\s+order|\s+having|$)",
-                sql,
-                re.IGNORECASE,
-            )
+            select_match = _RE_SELECT.search(sql)
             if not select_match:
                 return []
 
-            select_clause = select_match.group(1)
-            # Split by comma and clean up
-            columns = []
-            for col in select_clause.split(","):
-                col = col.strip()
-                # Remove aliases (AS keyword)
-                col = re.sub(r"\s+as\s+\w+", "", col, flags=re.IGNORECASE)
-                # Remove aggregate functions for column comparison
-                col = re.sub(r"\w+\s*\([^)]*\)", "AGG_FUNC", col)
-                columns.append(col)
-
-            return columns
+            return _split_select_clause(select_match.group(1))
         except Exception:
             return []
 
-    def extract_where_conditions(self, sql: str) -> List[str]:
+    def extract_where_conditions(
+        self, sql: str, sql_lc: Optional[str] = None
+    ) -> List[str]:
         """Extract WHERE conditions from SQL query"""
+        if "where" not in (sql_lc if sql_lc is not None else sql.lower()):
+            return []
         try:
-            where_match = re.search(
-                r"where\s+(.*?)(?:\s+group|\s+order|\s+having|$)", sql, re.IGNORECASE
-            )
+            where_match = _RE_WHERE.search(sql)
             if not where_match:
                 return []
 
-            where_clause = where_match.group(1)
-            # Split by AND/OR and clean up
-            conditions = []
-            for condition in re.split(
-                r"\s+and\s+|\s+or\s+", where_clause, flags=re.IGNORECASE
-            ):
-                condition = condition.strip()
-                # Normalize operators
-                condition = re.sub(r"\s*=\s*", " = ", condition)
-                condition = re.sub(r"\s*>\s*", " > ", condition)
-                condition = re.sub(r"\s*<\s*", " < ", condition)
-                condition = re.sub(
-                    r"\s*like\s+", " LIKE ", condition, flags=re.IGNORECASE
-                )
-                conditions.append(condition)
-
-            return conditions
+            return _split_where_clause(where_match.group(1))
         except Exception:
             return []
 
-    def extract_join_operations(self, sql: str) -> List[str]:
+    def extract_join_operations(
+        self, sql: str, sql_lc: Optional[str] = None
+    ) -> List[str]:
         """Extract JOIN operations from SQL query"""
+        if "join" not in (sql_lc if sql_lc is not None else sql.lower()):
+            return []
         try:
-            join_matches = re.findall(
-                r"join\s+(\w+)(?:\s+on\s+([^join]*?))?(?=\s+join|\s+where|\s+group|\s+order|\s+having|$)",
-                sql,
-                re.IGNORECASE,
-            )
-            joins = []
-            for match in join_matches:
-                table = match[0]
-                condition = match[1].strip() if match[1] else ""
-                join_info = f"JOIN {table}"
-                if condition:
-                    join_info += f" ON {condition}"
-                joins.append(join_info)
-
-            return joins
+            join_matches = _RE_JOIN.findall(sql)
+            return [_format_join(table, condition) for table, condition in join_matches]
         except Exception:
             return []
 
-    def extract_group_by_columns(self, sql: str) -> List[str]:
+    def extract_group_by_columns(
+        self, sql: str, sql_lc: Optional[str] = None
+    ) -> List[str]:
         """Extract GROUP BY columns from SQL query"""
+        if "group" not in (sql_lc if sql_lc is not None else sql.lower()):
+            return []
         try:
-            group_match = re.search(
-                r"group\s+by\s+(.*?)(?:\s+having|\s+order|$)", sql, re.IGNORECASE
-            )
+            group_match = _RE_GROUP.search(sql)
             if not group_match:
                 return []
 
-            group_clause = group_match.group(1)
-            columns = [col.strip() for col in group_clause.split(",")]
-            return columns
+            return _split_group_by_clause(group_match.group(1))
         except Exception:
             return []
 
-    def extract_order_by_columns(self, sql: str) -> List[str]:
+    def extract_order_by_columns(
+        self, sql: str, sql_lc: Optional[str] = None
+    ) -> List[str]:
         """Extract ORDER BY columns from SQL query"""
+        if "order" not in (sql_lc if sql_lc is not None else sql.lower()):
+            return []
         try:
-            order_match = re.search(
-                r"order\s+by\s+(.*?)(?:\s+limit|$)", sql, re.IGNORECASE
-            )
+            order_match = _RE_ORDER.search(sql)
             if not order_match:
                 return []
 
-            order_clause = order_match.group(1)
-            columns = []
-            for col in order_clause.split(","):
-                col = col.strip()
-                # Remove ASC/DESC for comparison
-                col = re.sub(r"\s+(asc|desc)", "", col, flags=re.IGNORECASE)
-                columns.append(col)
-            return columns
+            return _split_order_by_clause(order_match.group(1))
         except Exception:
             return []
 
-    def extract_aggregate_functions(self, sql: str) -> List[str]:
+    def extract_aggregate_functions(
+        self, sql: str, sql_lc: Optional[str] = None
+    ) -> List[str]:
         """Extract aggregate functions from SQL query"""
+        if "(" not in (sql_lc if sql_lc is not None else sql.lower()):
+            return []
         try:
             # Find all aggregate functions in SELECT clause
-            select_match = re.search(
-                r"select\s+(.*?)(?:\s+from|\s+where|\s+group|\s+order|\s+having|$)",
-                sql,
-                re.IGNORECASE,
-            )
+            select_match = _RE_SELECT.search(sql)
             if not select_match:
                 return []
 
-            select_clause = select_match.group(1)
-            agg_functions = re.findall(
-                r"\b(count|sum|avg|min|max|distinct)\s*\([^)]*\)",
-                select_clause,
-                re.IGNORECASE,
-            )
-            return [func.lower() for func in agg_functions]
+            return _find_aggregates(select_match.group(1))
         except Exception:
             return []
 
+    def _parse_sql_components(self, sql: str) -> Dict[str, List[str]]:
+        """Extract all components in one walk over the sqlparse token stream"""
+        sqlparse = _sqlparse()
+        statements = sqlparse.parse(sql)
+        clauses = {"select": None, "group_by": None, "order_by": None}
+        where_clause = None
+        joins = []
+
+        current = None
+        for token in statements[0].tokens if statements else ():
+            if isinstance(token, sqlparse.sql.Where):
+                # Where groups run up to GROUP BY / ORDER BY / LIMIT / HAVING
+                where_clause = "".join(str(t) for t in token.tokens[1:])
+                current = None
+                continue
+
+            keyword = token.normalized if token.is_keyword else None
+            if keyword == "SELECT" and token.ttype is sqlparse.tokens.DML:
+                current = "select"
+                clauses[current] = []
+            elif keyword in ("GROUP BY", "ORDER BY"):
+                current = keyword.replace(" ", "_").lower()
+                clauses[current] = []
+            elif keyword is not None and keyword.endswith("JOIN"):
+                current = "join_table"
+                joins.append(["", []])
+            elif keyword == "ON" and current == "join_table":
+                current = "join_on"
+            elif keyword in _CLAUSE_END_KEYWORDS:
+                current = None
+            elif current == "join_table" and isinstance(token, sqlparse.sql.Identifier):
+                joins[-1][0] = token.get_real_name()
+            elif current == "join_table" and token.ttype is sqlparse.tokens.Name:
+                joins[-1][0] = token.value
+            elif current == "join_on":
+                joins[-1][1].append(str(token))
+            elif current is not None and current != "join_table":
+                clauses[current].append(str(token))
+
+        select_clause = "".join(clauses["select"] or ())
+        group_clause = "".join(clauses["group_by"] or ()).strip()
+        order_clause = "".join(clauses["order_by"] or ()).strip()
+
+        return {
+            "select_columns": (
+                _split_select_clause(select_clause) if select_clause.strip() else []
+            ),
+            "where_conditions": (
+                _split_where_clause(where_clause.strip()) if where_clause else []
+            ),
+            "join_operations": [
+                _format_join(table, "".join(condition).strip())
+                for table, condition in joins
+                if table
+            ],
+            "group_by_columns": (
+                _split_group_by_clause(group_clause) if group_clause else []
+            ),
+            "order_by_columns": (
+                _split_order_by_clause(order_clause) if order_clause else []
+            ),
+            "aggregate_functions": _find_aggregates(select_clause),
+        }
+
+    def _extract_components(self, sql: str) -> Dict[str, Tuple[str, ...]]:
+        """Extract every component of a query; results are cached, do not mutate"""
+        try:
+            components = self._parse_sql_components(sql)
+        except Exception:
+            # Fall back to the per-clause regex extractors
+            sql_lc = sql.lower()
+            components = {
+                "select_columns": self.extract_select_columns(sql, sql_lc),
+                "where_conditions": self.extract_where_conditions(sql, sql_lc),
+                "join_operations": self.extract_join_operations(sql, sql_lc),
+                "group_by_columns": self.extract_group_by_columns(sql, sql_lc),
+                "order_by_columns": self.extract_order_by_columns(sql, sql_lc),
+                "aggregate_functions": self.extract_aggregate_functions(sql, sql_lc),
+            }
+        return {name: tuple(items) for name, items in components.items()}
+
     def calculate_component_precision_recall(
-        self, predicted: List[str], ground_truth: List[str]
+        self, pred_set: AbstractSet[str], gt_set: AbstractSet[str]
     ) -> Tuple[float, float]:
-        """Calculate precision and recall for component lists"""
-        if not ground_truth:
-            return 1.0 if not predicted else 0.0
-        if not predicted:
+        """Calculate precision and recall for component item sets"""
+        if not gt_set:
+            return (1.0, 1.0) if not pred_set else (0.0, 0.0)
+        if not pred_set:
             return 0.0, 0.0
 
-        pred_set = set(predicted)
-        gt_set = set(ground_truth)
-
         true_positives = len(pred_set & gt_set)
-        precision = true_positives / len(pred_set) if pred_set else 0.0
-        recall = true_positives / len(gt_set) if gt_set else 0.0
+        precision = true_positives / len(pred_set)
+        recall = true_positives / len(gt_set)
 
         return precision, recall
 
@@ -220,7 +358,7 @@ class ComponentMetricsCalculator:
     ) -> ComponentAnalysis:
         """Analyze a specific SQL component"""
         precision, recall = self.calculate_component_precision_recall(
-            predicted_items, ground_truth_items
+            frozenset(predicted_items), frozenset(ground_truth_items)
         )
         f1_score = self.calculate_component_f1(precision, recall)
         exact_match = predicted_items == ground_truth_items
@@ -240,24 +378,13 @@ class ComponentMetricsCalculator:
     ) -> ComponentMetrics:
         """Calculate comprehensive component-level metrics"""
 
-        # Extract components from both queries
-        predicted_components = {
-            "select_columns": self.extract_select_columns(predicted_sql),
-            "where_conditions": self.extract_where_conditions(predicted_sql),
-            "join_operations": self.extract_join_operations(predicted_sql),
-            "group_by_columns": self.extract_group_by_columns(predicted_sql),
-            "order_by_columns": self.extract_order_by_columns(predicted_sql),
-            "aggregate_functions": self.extract_aggregate_functions(predicted_sql),
-        }
+        # Canonicalize so formatting-only differences share cache entries
+        predicted_sql = _canonicalize_sql(predicted_sql)
+        ground_truth_sql = _canonicalize_sql(ground_truth_sql)
 
-        ground_truth_components = {
-            "select_columns": self.extract_select_columns(ground_truth_sql),
-            "where_conditions": self.extract_where_conditions(ground_truth_sql),
-            "join_operations": self.extract_join_operations(ground_truth_sql),
-            "group_by_columns": self.extract_group_by_columns(ground_truth_sql),
-            "order_by_columns": self.extract_order_by_columns(ground_truth_sql),
-            "aggregate_functions": self.extract_aggregate_functions(ground_truth_sql),
-        }
+        # Extract components from both queries
+        predicted_components = self._extract_all_components(predicted_sql)
+        ground_truth_components = self._extract_all_components(ground_truth_sql)
 
         # Analyze each component
         component_analyses = {}
@@ -268,8 +395,8 @@ class ComponentMetricsCalculator:
         for component_type in self.component_weights:
             analysis = self.analyze_component(
                 component_type,
-                predicted_components[component_type],
-                ground_truth_components[component_type],
+                list(predicted_components[component_type]),
+                list(ground_truth_components[component_type]),
             )
             component_analyses[component_type] = analysis
 
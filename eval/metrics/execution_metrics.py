@@ -4,15 +4,57 @@ Execution-level evaluation metrics for SQL queries
 Provides metrics for query execution success, performance, and result accuracy.
 """
 
+import functools
 import time
-import pandas as pd
-from typing import Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from enum import IntEnum
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
+
+import numpy as np
 from sqlalchemy import text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql.elements import TextClause
+
+# SQLite VM instructions between timeout checks
+_SQLITE_PROGRESS_STEPS = 10000
+
+
+@functools.lru_cache(maxsize=2048)
+def _statement(sql: str) -> TextClause:
+    """Parse SQL into a TextClause once; identical queries reuse the statement"""
+    return text(sql)
+
+
+class ErrorCode(IntEnum):
+    """Execution failure categories used for error analysis"""
 
+    NONE = 0
+    SYNTAX = 1
+    SCHEMA = 2
+    TIMEOUT = 3
+    OTHER = 4
 
-@dataclass
+
+# error_types keys reported for each ErrorCode (NONE is not reported)
+_ERROR_TYPE_KEYS = (None, "syntax_error", "schema_error", "timeout", "other")
+
+
+def classify_error(error_message: Optional[str]) -> ErrorCode:
+    """Categorize an execution error message"""
+    if not error_message:
+        return ErrorCode.NONE
+    error_msg = error_message.lower()
+    if "syntax" in error_msg:
+        return ErrorCode.SYNTAX
+    if "table" in error_msg or "column" in error_msg:
+        return ErrorCode.SCHEMA
+    if "timeout" in error_msg:
+        return ErrorCode.TIMEOUT
+    return ErrorCode.OTHER
+
+
+@dataclass(slots=True)
 class ExecutionMetrics:
     """Container for execution evaluation metrics"""
 
@@ -31,22 +73,59 @@ class ExecutionMetricsCalculator:
     def __init__(self, timeout: float = 30.0):
         self.timeout = timeout
 
-    def execute_query(
-        self, engine: Engine, sql: str
-    ) -> Tuple[bool, Optional[pd.DataFrame], str, float]:
-        """Execute SQL query and return results with timing"""
+    def execute_query(self, engine: Engine, sql: str) -> Tuple[bool, int, str, float]:
+        """Execute SQL query and return its row count with timing"""
+        start_time = time.time()
+
+        try:
+            with engine.connect() as conn:
+                return self._execute_on_connection(conn, sql)
+        except Exception as e:
+            execution_time = time.time() - start_time
+            return False, 0, str(e), execution_time
+
+    def _execute_on_connection(
+        self, conn: Connection, sql: str
+    ) -> Tuple[bool, int, str, float]:
+        """Run one query in its own transaction on an open connection"""
         start_time = time.time()
+        dialect = conn.dialect.name
+        sqlite_conn = None
 
         try:
-            with engine.begin() as conn:
-                df = pd.read_sql(text(sql), conn)
+            with conn.begin():
+                # Enforce the timeout in the driver so runaway queries are killed
+                if dialect == "postgresql":
+                    timeout_ms = int(self.timeout * 1000)
+                    conn.execute(
+                        _statement(f"SET LOCAL statement_timeout = {timeout_ms}")
+                    )
+                elif dialect == "sqlite":
+                    deadline = start_time + self.timeout
+                    sqlite_conn = conn.connection.driver_connection
+                    sqlite_conn.set_progress_handler(
+                        lambda: time.time() > deadline, _SQLITE_PROGRESS_STEPS
+                    )
+
+                result = conn.execute(_statement(sql))
+                if not result.returns_rows:
+                    # Raising inside the transaction rolls back any changes
+                    raise ValueError("This result object does not return rows.")
+                row_count = len(result.fetchall())
             execution_time = time.time() - start_time
 
-            return True, df, "", execution_time
+            return True, row_count, "", execution_time
 
         except Exception as e:
             execution_time = time.time() - start_time
-            return False, None, str(e), execution_time
+            error_msg = str(e)
+            if execution_time >= self.timeout:
+                error_msg = f"Query timeout after {self.timeout:.1f}s"
+            return False, 0, error_msg, execution_time
+
+        finally:
+            if sqlite_conn is not None:
+                sqlite_conn.set_progress_handler(None, 0)
 
     def calculate_result_accuracy(
         self, actual_count: int, expected_count: Optional[int]
@@ -89,10 +168,15 @@ class ExecutionMetricsCalculator:
         """Evaluate SQL query execution"""
 
         # Execute query
-        success, df, error_msg, execution_time = self.execute_query(engine, sql)
+        return self._build_metrics(self.execute_query(engine, sql), expected_count)
 
-        # Get result count
-        result_count = len(df) if df is not None else 0
+    def _build_metrics(
+        self,
+        execution: Tuple[bool, int, str, float],
+        expected_count: Optional[int],
+    ) -> ExecutionMetrics:
+        """Score the outcome of an executed query"""
+        success, result_count, error_msg, execution_time = execution
 
         # Calculate accuracy
         result_accuracy = self.calculate_result_accuracy(result_count, expected_count)
@@ -111,16 +195,48 @@ class ExecutionMetricsCalculator:
         )
 
     def batch_evaluate_executions(
-        self, engine: Engine, sql_queries: list, expected_counts: Optional[list] = None
+        self,
+        engine: Engine,
+        sql_queries: list,
+        expected_counts: Optional[list] = None,
+        max_workers: int = 1,
     ) -> list:
-        """Evaluate multiple SQL queries in batch"""
+        """
+        Evaluate multiple SQL queries in batch
+
+        Queries share one pooled connection per worker instead of checking
+        out a connection per query; with max_workers > 1 the batch is split
+        round-robin across that many connections.
+        """
         if expected_counts is None:
             expected_counts = [None] * len(sql_queries)
 
-        results = []
-        for sql, expected_count in zip(sql_queries, expected_counts):
-            metrics = self.evaluate_execution(engine, sql, expected_count)
-            results.append(metrics)
+        def run_chunk(indices: List[int]) -> List[Tuple[int, ExecutionMetrics]]:
+            with engine.connect() as conn:
+                return [
+                    (
+                        i,
+                        self._build_metrics(
+                            self._execute_on_connection(conn, sql_queries[i]),
+                            expected_counts[i],
+                        ),
+                    )
+                    for i in indices
+                ]
+
+        workers = max(1, min(max_workers, len(sql_queries)))
+        chunks = [list(range(w, len(sql_queries), workers)) for w in range(workers)]
+
+        results: List[Optional[ExecutionMetrics]] = [None] * len(sql_queries)
+        if workers == 1:
+            scored = [run_chunk(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                scored = list(executor.map(run_chunk, chunks))
+
+        for chunk in scored:
+            for i, metrics in chunk:
+                results[i] = metrics
 
         return results
 
@@ -150,19 +266,20 @@ class ExecutionMetricsCalculator:
         )
 
         # Error analysis
-        error_types = {}
-        for result in execution_results:
-            if not result.success and result.error_message:
-                # Categorize errors
-                error_msg = result.error_message.lower()
-                if "syntax" in error_msg:
-                    error_types["syntax_error"] = error_types.get("syntax_error", 0) + 1
-                elif "table" in error_msg or "column" in error_msg:
-                    error_types["schema_error"] = error_types.get("schema_error", 0) + 1
-                elif "timeout" in error_msg:
-                    error_types["timeout"] = error_types.get("timeout", 0) + 1
-                else:
-                    error_types["other"] = error_types.get("other", 0) + 1
+        codes = np.fromiter(
+            (
+                ErrorCode.NONE if r.success else classify_error(r.error_message)
+                for r in execution_results
+            ),
+            dtype=np.int8,
+            count=total_queries,
+        )
+        counts = np.bincount(codes, minlength=len(ErrorCode)).tolist()
+        error_types = {
+            key: count
+            for key, count in zip(_ERROR_TYPE_KEYS, counts)
+            if key is not None and count
+        }
 
         return {
             "total_queries": total_queries,
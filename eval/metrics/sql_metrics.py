@@ -6,10 +6,94 @@ at various levels of granularity.
 """
 
 import re
-import sqlparse
-from typing import Dict, List, Tuple, Any
+import sys
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
-from collections import Counter
+
+import numpy as np
+
+from ._aggregate import score_counts
+
+# Normalization patterns, compiled once at import; all run on lowercased SQL
+_RE_LIMIT = re.compile(r"limit\s+\d+")
+_RE_ANDOR = re.compile(r"\s+and\s+|\s+or\s+")
+
+# Clause keywords in whitespace-collapsed, lowercased SQL
+_RE_CLAUSE = re.compile(r"\b(select|from|where|group by|order by|having|limit|join)\b")
+_RE_WORD = re.compile(r"\w+")
+
+# Component importance weights for overall scoring
+_COMPONENT_WEIGHTS = (
+    ("select", 0.25),
+    ("where", 0.25),
+    ("join", 0.20),
+    ("group_by", 0.15),
+    ("order_by", 0.10),
+    ("having", 0.05),
+)
+_COMPONENT_NAMES = tuple(name for name, _ in _COMPONENT_WEIGHTS)
+_COMPONENT_WEIGHTS_ARR = np.array([weight for _, weight in _COMPONENT_WEIGHTS])
+
+# Component scores of a prediction that normalizes to the ground truth
+_ALL_ONES_COMPONENTS = {
+    name: {"precision": 1.0, "recall": 1.0, "f1_score": 1.0}
+    for name in (*_COMPONENT_NAMES, "overall")
+}
+
+# Statements accepted by validate_sql_syntax
+_VALID_VERBS = frozenset({"select", "insert", "update", "delete", "with"})
+
+# Clause keyword -> keywords that end its body
+_CLAUSE_ENDS = {
+    "select": ("from", "where", "group by", "order by", "having"),
+    "where": ("group by", "order by", "having", "limit"),
+    "group by": ("having", "order by", "limit"),
+    "having": ("order by", "limit"),
+    "order by": ("limit",),
+}
+
+
+def _scan_clauses(sql: str) -> Tuple[Dict[str, str], List[str]]:
+    """Slice lowercased clause bodies and joined table names out of sql in one pass"""
+    lc = " ".join(sql.lower().split())
+    tokens = [(m.group(1), m.start(), m.end()) for m in _RE_CLAUSE.finditer(lc)]
+
+    clauses = {}
+    joins = []
+    seen = set()
+    for index, (keyword, start, end) in enumerate(tokens):
+        if keyword == "join":
+            name = _RE_WORD.match(lc, end + 1)
+            if name:
+                joins.append(name.group())
+            continue
+
+        enders = _CLAUSE_ENDS.get(keyword)
+        if enders is None or keyword in seen:
+            continue
+        seen.add(keyword)
+
+        body_end = next(
+            (pos for kw, pos, _ in tokens[index + 1 :] if kw in enders), len(lc)
+        )
+        body = lc[end + 1 : body_end].strip()
+        if body:
+            clauses[keyword] = body
+
+    return clauses, joins
+
+
+# Largest item tuples intersected by linear scan instead of hashing
+_SMALL_SET_SIZE = 4
+
+
+def _count_common(predicted: Tuple[str, ...], ground_truth: Tuple[str, ...]) -> int:
+    """Count items shared by two duplicate-free tuples"""
+    if len(predicted) <= _SMALL_SET_SIZE and len(ground_truth) <= _SMALL_SET_SIZE:
+        return sum(1 for item in predicted if item in ground_truth)
+    return len(frozenset(predicted).intersection(ground_truth))
 
 
 @dataclass
@@ -29,33 +113,45 @@ class SQLMetricsCalculator:
     """Calculate various SQL evaluation metrics"""
 
     def __init__(self):
-        self.component_weights = {
-            "select": 0.25,
-            "where": 0.25,
-            "join": 0.20,
-            "group_by": 0.15,
-            "order_by": 0.10,
-            "having": 0.05,
-        }
+        # Per-instance memos: the same SQL strings recur across questions and runs
+        self._normalize_cached = functools.lru_cache(maxsize=4096)(self._normalize)
+        self._extract_cached = functools.lru_cache(maxsize=4096)(
+            self._extract_components
+        )
+        self._validate_cached = functools.lru_cache(maxsize=2048)(self._validate)
+
+    def cache_clear(self) -> None:
+        """Drop memoized normalization, extraction and validation results"""
+        self._normalize_cached.cache_clear()
+        self._extract_cached.cache_clear()
+        self._validate_cached.cache_clear()
 
     def normalize_sql(self, sql: str) -> str:
         """Normalize SQL for comparison"""
+        return self._normalize_cached(sql)
+
+    def _normalize(self, sql: str) -> str:
+        """Uncached normalize_sql implementation"""
         if not sql:
             return ""
 
         # Remove extra whitespace and normalize case
-        sql = re.sub(r"\s+", " ", sql.strip().lower())
+        sql = " ".join(sql.lower().split())
 
         # Remove trailing semicolons
         sql = sql.rstrip(";")
 
         # Normalize LIMIT clauses
-        sql = re.sub(r"limit\s+\d+", "limit 200", sql)
+        sql = _RE_LIMIT.sub("limit 200", sql)
 
         return sql
 
     def extract_sql_components(self, sql: str) -> Dict[str, List[str]]:
         """Extract SQL components for comparison"""
+        return {name: list(items) for name, items in self._extract_cached(sql).items()}
+
+    def _extract_components(self, sql: str) -> Dict[str, Tuple[str, ...]]:
+        """Extract components of a query; results are cached, do not mutate"""
         components = {
             "select": [],
             "where": [],
@@ -65,80 +161,34 @@ class SQLMetricsCalculator:
             "having": [],
         }
 
-        try:
-            parsed = sqlparse.parse(sql)[0]
-            self._extract_from_parsed(parsed, components)
-        except Exception:
-            # Fallback to regex-based extraction
-            self._extract_with_regex(sql, components)
-
-        return components
-
-    def _extract_from_parsed(self, statement, components: Dict[str, List[str]]):
-        """Extract components from parsed SQL"""
-        for token in statement.flatten():
-            if token.ttype is sqlparse.tokens.Keyword:
-                keyword = token.value.lower()
-                if keyword in components:
-                    # Extract relevant parts after keyword
-                    pass
-
-    def _extract_with_regex(self, sql: str, components: Dict[str, List[str]]):
-        """Fallback regex-based component extraction"""
-        # SELECT columns
-        select_match = re.search(
-            r"select\s+(.*?)(?:\s+from|\s+where|\s+group|\s+order|\s+having|$)",
-            sql,
-            re.IGNORECASE,
-        )
-        if select_match:
-            select_clause = select_match.group(1)
-            components["select"] = [col.strip() for col in select_clause.split(",")]
-
-        # WHERE conditions
-        where_match = re.search(
-            r"where\s+(.*?)(?:\s+group|\s+order|\s+having|$)", sql, re.IGNORECASE
-        )
-        if where_match:
-            where_clause = where_match.group(1)
-            components["where"] = [
-                cond.strip()
-                for cond in re.split(
-                    r"\s+and\s+|\s+or\s+", where_clause, flags=re.IGNORECASE
-                )
+        clauses, joins = _scan_clauses(sql)
+        # Interned items let identical identifiers share one string object
+        components["join"] = [sys.intern(table) for table in joins]
+        for keyword, body in clauses.items():
+            if keyword in ("where", "having"):
+                items = _RE_ANDOR.split(body)
+            else:
+                items = body.split(",")
+            components[keyword.replace(" ", "_")] = [
+                sys.intern(item.strip()) for item in items
             ]
 
-        # JOIN operations
-        join_matches = re.findall(r"join\s+(\w+)", sql, re.IGNORECASE)
-        components["join"] = join_matches
-
-        # GROUP BY
-        group_match = re.search(
-            r"group\s+by\s+(.*?)(?:\s+having|\s+order|$)", sql, re.IGNORECASE
-        )
-        if group_match:
-            group_clause = group_match.group(1)
-            components["group_by"] = [col.strip() for col in group_clause.split(",")]
-
-        # ORDER BY
-        order_match = re.search(r"order\s+by\s+(.*?)(?:\s+limit|$)", sql, re.IGNORECASE)
-        if order_match:
-            order_clause = order_match.group(1)
-            components["order_by"] = [col.strip() for col in order_clause.split(",")]
+        # Deduplicate once here so scoring can treat the tuples as ordered sets
+        return {name: tuple(dict.fromkeys(items)) for name, items in components.items()}
 
     def calculate_precision_recall(
         self, predicted: List[str], ground_truth: List[str]
     ) -> Tuple[float, float]:
         """Calculate precision and recall for two lists"""
         if not ground_truth:
-            return 1.0 if not predicted else 0.0
+            return (1.0, 1.0) if not predicted else (0.0, 0.0)
         if not predicted:
             return 0.0, 0.0
 
-        pred_set = set(predicted)
-        gt_set = set(ground_truth)
+        pred_set = frozenset(predicted)
+        gt_set = frozenset(ground_truth)
 
-        true_positives = len(pred_set & gt_set)
+        true_positives = len(pred_set.intersection(gt_set))
         precision = true_positives / len(pred_set) if pred_set else 0.0
         recall = true_positives / len(gt_set) if gt_set else 0.0
 
@@ -150,56 +200,91 @@ class SQLMetricsCalculator:
             return 0.0
         return 2 * (precision * recall) / (precision + recall)
 
+    def _component_counts(
+        self, predicted_sql: str, ground_truth_sql: str
+    ) -> List[Tuple[int, int, int]]:
+        """Raw (true positives, predicted, ground truth) sizes per component"""
+        pred_components = self._extract_cached(predicted_sql)
+        gt_components = self._extract_cached(ground_truth_sql)
+
+        counts = []
+        for component in _COMPONENT_NAMES:
+            pred_items = pred_components[component]
+            gt_items = gt_components[component]
+            counts.append(
+                (_count_common(pred_items, gt_items), len(pred_items), len(gt_items))
+            )
+        return counts
+
+    def calculate_component_metrics_batch(
+        self, predicted_sqls: List[str], ground_truth_sqls: List[str]
+    ) -> List[Dict[str, Dict[str, float]]]:
+        """Calculate component-level metrics for many query pairs at once"""
+        counts = np.array(
+            [
+                self._component_counts(pred, gt)
+                for pred, gt in zip(predicted_sqls, ground_truth_sqls)
+            ],
+            dtype=np.int64,
+        ).reshape(-1, len(_COMPONENT_NAMES), 3)
+        precision, recall, f1, overall_p, overall_r, overall_f1 = score_counts(
+            counts, _COMPONENT_WEIGHTS_ARR
+        )
+
+        batch_scores = []
+        for p_row, r_row, f_row, p, r, f in zip(
+            precision.tolist(),
+            recall.tolist(),
+            f1.tolist(),
+            overall_p.tolist(),
+            overall_r.tolist(),
+            overall_f1.tolist(),
+        ):
+            component_scores = {
+                component: {"precision": cp, "recall": cr, "f1_score": cf}
+                for component, cp, cr, cf in zip(_COMPONENT_NAMES, p_row, r_row, f_row)
+            }
+            component_scores["overall"] = {"precision": p, "recall": r, "f1_score": f}
+            batch_scores.append(component_scores)
+
+        return batch_scores
+
     def calculate_component_metrics(
         self, predicted_sql: str, ground_truth_sql: str
     ) -> Dict[str, Dict[str, float]]:
         """Calculate component-level metrics"""
-        pred_components = self.extract_sql_components(predicted_sql)
-        gt_components = self.extract_sql_components(ground_truth_sql)
-
-        component_scores = {}
-        total_precision = 0.0
-        total_recall = 0.0
-        total_weight = 0.0
-
-        for component in self.component_weights:
-            if component in pred_components and component in gt_components:
-                precision, recall = self.calculate_precision_recall(
-                    pred_components[component], gt_components[component]
-                )
-                f1 = self.calculate_f1_score(precision, recall)
-
-                component_scores[component] = {
-                    "precision": precision,
-                    "recall": recall,
-                    "f1_score": f1,
-                }
-
-                weight = self.component_weights[component]
-                total_precision += precision * weight
-                total_recall += recall * weight
-                total_weight += weight
-
-        # Overall weighted metrics
-        if total_weight > 0:
-            component_scores["overall"] = {
-                "precision": total_precision / total_weight,
-                "recall": total_recall / total_weight,
-                "f1_score": self.calculate_f1_score(
-                    total_precision / total_weight, total_recall / total_weight
-                ),
-            }
-
-        return component_scores
+        return self.calculate_component_metrics_batch(
+            [predicted_sql], [ground_truth_sql]
+        )[0]
 
     def validate_sql_syntax(self, sql: str) -> bool:
-        """Validate SQL syntax"""
-        try:
-            sqlparse.parse(sql)
-            return True
-        except Exception:
+        """Validate SQL syntax by checking the verb, parentheses and quotes"""
+        return self._validate_cached(sql)
+
+    def _validate(self, sql: str) -> bool:
+        """Uncached validate_sql_syntax implementation"""
+        s = sql.strip().lower() if sql else ""
+        statement = s.lstrip("(")
+        if not statement or statement.split(None, 1)[0] not in _VALID_VERBS:
             return False
 
+        paren_depth = 0
+        quote = None
+        for ch in s:
+            if quote is not None:
+                if ch == quote:
+                    quote = None
+            elif ch == "'" or ch == '"':
+                quote = ch
+            elif ch == "(":
+                paren_depth += 1
+            elif ch == ")":
+                paren_depth -= 1
+                if paren_depth < 0:
+                    return False
+
+        return quote is None and paren_depth == 0
+
     def calculate_exact_match(self, predicted_sql: str, ground_truth_sql: str) -> float:
         """Calculate exact match score (normalized comparison)"""
         pred_norm = self.normalize_sql(predicted_sql)
@@ -211,14 +296,110 @@ class SQLMetricsCalculator:
         self, predicted_sql: str, ground_truth_sql: str, execution_success: bool = True
     ) -> SQLMetrics:
         """Calculate comprehensive SQL evaluation metrics"""
+        if self.calculate_exact_match(predicted_sql, ground_truth_sql):
+            return self._exact_match_metrics(predicted_sql, execution_success)
 
-        # Exact match
-        exact_match = self.calculate_exact_match(predicted_sql, ground_truth_sql)
-
-        # Component-level metrics
         component_scores = self.calculate_component_metrics(
             predicted_sql, ground_truth_sql
         )
+        return self._build_sql_metrics(
+            predicted_sql, ground_truth_sql, execution_success, component_scores
+        )
+
+    def evaluate_batch(
+        self,
+        predicted_sqls: List[str],
+        ground_truth_sqls: List[str],
+        execution_successes: Optional[List[bool]] = None,
+        max_workers: Optional[int] = None,
+        chunksize: int = 64,
+    ) -> List[SQLMetrics]:
+        """
+        Evaluate many query pairs, spreading chunks across worker processes
+
+        Batches no larger than one chunk, or max_workers=1, run in this process.
+        """
+        if execution_successes is None:
+            execution_successes = [True] * len(predicted_sqls)
+
+        if max_workers == 1 or len(predicted_sqls) <= chunksize:
+            return self._evaluate_serial(
+                predicted_sqls, ground_truth_sqls, execution_successes
+            )
+
+        chunks = [
+            (
+                predicted_sqls[start : start + chunksize],
+                ground_truth_sqls[start : start + chunksize],
+                execution_successes[start : start + chunksize],
+            )
+            for start in range(0, len(predicted_sqls), chunksize)
+        ]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return [
+                metrics
+                for chunk in executor.map(_evaluate_chunk, chunks)
+                for metrics in chunk
+            ]
+
+    def _evaluate_serial(
+        self,
+        predicted_sqls: List[str],
+        ground_truth_sqls: List[str],
+        execution_successes: List[bool],
+    ) -> List[SQLMetrics]:
+        """Evaluate query pairs in this process with one vectorized scoring pass"""
+        exact = [
+            bool(self.calculate_exact_match(pred, gt))
+            for pred, gt in zip(predicted_sqls, ground_truth_sqls)
+        ]
+
+        # Only pairs that differ after normalization need component scoring
+        pending = [i for i, matched in enumerate(exact) if not matched]
+        batch_scores = iter(
+            self.calculate_component_metrics_batch(
+                [predicted_sqls[i] for i in pending],
+                [ground_truth_sqls[i] for i in pending],
+            )
+        )
+        return [
+            (
+                self._exact_match_metrics(pred, success)
+                if matched
+                else self._build_sql_metrics(pred, gt, success, next(batch_scores))
+            )
+            for pred, gt, success, matched in zip(
+                predicted_sqls, ground_truth_sqls, execution_successes, exact
+            )
+        ]
+
+    def _exact_match_metrics(
+        self, predicted_sql: str, execution_success: bool
+    ) -> SQLMetrics:
+        """Metrics for a prediction that normalizes to the ground truth"""
+        return SQLMetrics(
+            exact_match=1.0,
+            precision=1.0,
+            recall=1.0,
+            f1_score=1.0,
+            component_scores={
+                name: dict(scores) for name, scores in _ALL_ONES_COMPONENTS.items()
+            },
+            execution_success=execution_success,
+            syntax_valid=self.validate_sql_syntax(predicted_sql),
+        )
+
+    def _build_sql_metrics(
+        self,
+        predicted_sql: str,
+        ground_truth_sql: str,
+        execution_success: bool,
+        component_scores: Dict[str, Dict[str, float]],
+    ) -> SQLMetrics:
+        """Combine component scores with exact match and syntax checks"""
+
+        # Exact match
+        exact_match = self.calculate_exact_match(predicted_sql, ground_truth_sql)
 
         # Overall precision/recall from components
         overall_precision = component_scores.get("overall", {}).get("precision", 0.0)
@@ -237,3 +418,17 @@ class SQLMetricsCalculator:
             execution_success=execution_success,
             syntax_valid=syntax_valid,
         )
+
+
+# Calculator owned by each evaluate_batch worker process
+_worker_calculator: Optional[SQLMetricsCalculator] = None
+
+
+def _evaluate_chunk(
+    chunk: Tuple[List[str], List[str], List[bool]],
+) -> List[SQLMetrics]:
+    """Evaluate one evaluate_batch chunk inside a worker process"""
+    global _worker_calculator
+    if _worker_calculator is None:
+        _worker_calculator = SQLMetricsCalculator()
+    return _worker_calculator._evaluate_serial(*chunk)
@@ -9,164 +9,93 @@ Generates comprehensive HTML reports for evaluation results including:
 - Model comparisons
 """
 
+import html
 import json
 import time
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, Any, Optional
 from pathlib import Path
 from datetime import datetime
 
+from jinja2 import BaseLoader, Environment
+
 from .evaluator import AggregateEvaluationResults
 from src.utils.logger import get_logger
 
 logger = get_logger("text2sql.reports")
 
-
-class ReportGenerator:
-    """Generate comprehensive evaluation reports"""
-
-    def __init__(self):
-        self.template_dir = Path("eval/templates")
-        self.template_dir.mkdir(parents=True, exist_ok=True)
-
-    def generate_html_report(
-        self, results: AggregateEvaluationResults, output_dir: str = "results/reports"
-    ) -> str:
-        """Generate HTML report for evaluation results"""
-
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"evaluation_report_{results.dataset_name}_{timestamp}.html"
-        filepath = output_path / filename
-
-        # Generate HTML content
-        html_content = self._generate_report_html(results)
-
-        # Save HTML file
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(html_content)
-
-        logger.info(f"HTML report generated: {filepath}")
-        return str(filepath)
-
-    def generate_comparison_report(
-        self,
-        comparison_results: Dict[str, AggregateEvaluationResults],
-        output_dir: str = "results/reports",
-    ) -> str:
-        """Generate comparison report for multiple models"""
-
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
-
-        # Generate filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"model_comparison_report_{timestamp}.html"
-        filepath = output_path / filename
-
-        # Generate comparison HTML content
-        html_content = self._generate_comparison_html(comparison_results)
-
-        # Save HTML file
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(html_content)
-
-        logger.info(f"Comparison report generated: {filepath}")
-        return str(filepath)
-
-    def _generate_report_html(self, results: AggregateEvaluationResults) -> str:
-        """Generate HTML content for single evaluation report"""
-
-        # Component scores table
-        component_table = self._generate_component_table(results.component_scores)
-
-        # Error analysis
-        error_analysis = self._generate_error_analysis(results.error_types)
-
-        # Performance metrics
-        performance_metrics = self._generate_performance_metrics(results)
-
-        html_template = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Text-to-SQL Evaluation Report - {results.dataset_name}</title>
-    <style>
-        body {{
+# Stylesheets embedded in the generated reports
+_REPORT_CSS = """
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             margin: 0;
             padding: 20px;
             background-color: #f5f5f5;
             color: #333;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             background: white;
             padding: 30px;
             border-radius: 10px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .header {{
+        }
+        .header {
             text-align: center;
             margin-bottom: 40px;
             padding-bottom: 20px;
             border-bottom: 2px solid #e0e0e0;
-        }}
-        .header h1 {{
+        }
+        .header h1 {
             color: #2c3e50;
             margin: 0;
             font-size: 2.5em;
-        }}
-        .header p {{
+        }
+        .header p {
             color: #7f8c8d;
             margin: 10px 0 0 0;
             font-size: 1.1em;
-        }}
-        .metrics-grid {{
+        }
+        .metrics-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
             gap: 20px;
             margin-bottom: 40px;
-        }}
-        .metric-card {{
+        }
+        .metric-card {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 25px;
             border-radius: 10px;
             text-align: center;
             box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-        }}
-        .metric-card h3 {{
+        }
+        .metric-card h3 {
             margin: 0 0 10px 0;
             font-size: 0.9em;
             opacity: 0.9;
             text-transform: uppercase;
             letter-spacing: 1px;
-        }}
-        .metric-card .value {{
+        }
+        .metric-card .value {
             font-size: 2.5em;
             font-weight: bold;
             margin: 10px 0;
-        }}
-        .metric-card .subtitle {{
+        }
+        .metric-card .subtitle {
             font-size: 0.8em;
             opacity: 0.8;
-        }}
-        .section {{
+        }
+        .section {
             margin-bottom: 40px;
-        }}
-        .section h2 {{
+        }
+        .section h2 {
             color: #2c3e50;
             border-bottom: 2px solid #3498db;
             padding-bottom: 10px;
             margin-bottom: 20px;
-        }}
-        table {{
+        }
+        table {
             width: 100%;
             border-collapse: collapse;
             margin-bottom: 20px;
@@ -174,34 +103,34 @@ class ReportGenerator:
             border-radius: 8px;
             overflow: hidden;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        th, td {{
+        }
+        th, td {
             padding: 12px 15px;
             text-align: left;
             border-bottom: 1px solid #e0e0e0;
-        }}
-        th {{
+        }
+        th {
             background: #f8f9fa;
             font-weight: 600;
             color: #2c3e50;
-        }}
-        tr:hover {{
+        }
+        tr:hover {
             background-color: #f8f9fa;
-        }}
-        .progress-bar {{
+        }
+        .progress-bar {
             width: 100%;
             height: 20px;
             background-color: #e0e0e0;
             border-radius: 10px;
             overflow: hidden;
             margin: 5px 0;
-        }}
-        .progress-fill {{
+        }
+        .progress-fill {
             height: 100%;
             background: linear-gradient(90deg, #4CAF50, #45a049);
             transition: width 0.3s ease;
-        }}
-        .error-item {{
+        }
+        .error-item {
             display: flex;
             justify-content: space-between;
             align-items: center;
@@ -210,49 +139,124 @@ class ReportGenerator:
             border: 1px solid #ffeaa7;
             border-radius: 5px;
             margin: 5px 0;
-        }}
-        .error-count {{
+        }
+        .error-count {
             background: #e74c3c;
             color: white;
             padding: 5px 10px;
             border-radius: 15px;
             font-weight: bold;
-        }}
-        .footer {{
+        }
+        .footer {
             text-align: center;
             margin-top: 40px;
             padding-top: 20px;
             border-top: 1px solid #e0e0e0;
             color: #7f8c8d;
-        }}
-    </style>
+        }
+"""
+
+_COMPARISON_CSS = """
+        body {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            margin: 0;
+            padding: 20px;
+            background-color: #f5f5f5;
+            color: #333;
+        }
+        .container {
+            max-width: 1400px;
+            margin: 0 auto;
+            background: white;
+            padding: 30px;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        .header {
+            text-align: center;
+            margin-bottom: 40px;
+            padding-bottom: 20px;
+            border-bottom: 2px solid #e0e0e0;
+        }
+        .header h1 {
+            color: #2c3e50;
+            margin: 0;
+            font-size: 2.5em;
+        }
+        .comparison-table {
+            width: 100%;
+            border-collapse: collapse;
+            margin: 20px 0;
+            background: white;
+            border-radius: 8px;
+            overflow: hidden;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        .comparison-table th {
+            background: #3498db;
+            color: white;
+            padding: 15px;
+            text-align: center;
+            font-weight: 600;
+        }
+        .comparison-table td {
+            padding: 12px 15px;
+            text-align: center;
+            border-bottom: 1px solid #e0e0e0;
+        }
+        .comparison-table tr:hover {
+            background-color: #f8f9fa;
+        }
+        .best-score {
+            background-color: #d4edda;
+            font-weight: bold;
+            color: #155724;
+        }
+        .metric-row {
+            background-color: #f8f9fa;
+            font-weight: 600;
+        }
+"""
+
+
+# Page templates, compiled once; values are autoescaped unless marked safe
+_env = Environment(loader=BaseLoader(), autoescape=True, auto_reload=False)
+
+_REPORT_TEMPLATE = _env.from_string("""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Text-to-SQL Evaluation Report - {{ results.dataset_name }}</title>
+    <style>{{ css|safe }}</style>
 </head>
 <body>
     <div class="container">
         <div class="header">
             <h1>Text-to-SQL Evaluation Report</h1>
-            <p>Dataset: {results.dataset_name} | Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
+            <p>Dataset: {{ results.dataset_name }} | Generated: {{ generated_at }}</p>
         </div>
         
         <div class="metrics-grid">
             <div class="metric-card">
                 <h3>Overall F1 Score</h3>
-                <div class="value">{results.avg_f1_score:.3f}</div>
+                <div class="value">{{ "%.3f"|format(results.avg_f1_score) }}</div>
                 <div class="subtitle">Weighted Average</div>
             </div>
             <div class="metric-card">
                 <h3>Exact Match</h3>
-                <div class="value">{results.avg_exact_match:.3f}</div>
+                <div class="value">{{ "%.3f"|format(results.avg_exact_match) }}</div>
                 <div class="subtitle">Complete SQL Match</div>
             </div>
             <div class="metric-card">
                 <h3>Execution Success</h3>
-                <div class="value">{results.execution_success_rate:.3f}</div>
+                <div class="value">{{ "%.3f"|format(results.execution_success_rate) }}</div>
                 <div class="subtitle">Query Execution Rate</div>
             </div>
             <div class="metric-card">
                 <h3>Result Accuracy</h3>
-                <div class="value">{results.avg_result_accuracy:.3f}</div>
+                <div class="value">{{ "%.3f"|format(results.avg_result_accuracy) }}</div>
                 <div class="subtitle">Result Count Accuracy</div>
             </div>
         </div>
@@ -261,33 +265,39 @@ class ReportGenerator:
             <h2>Dataset Summary</h2>
             <table>
                 <tr><th>Metric</th><th>Value</th></tr>
-                <tr><td>Total Questions</td><td>{results.total_questions}</td></tr>
-                <tr><td>Successful Generations</td><td>{results.successful_generations}</td></tr>
-                <tr><td>Successful Executions</td><td>{results.successful_executions}</td></tr>
-                <tr><td>Average Precision</td><td>{results.avg_precision:.3f}</td></tr>
-                <tr><td>Average Recall</td><td>{results.avg_recall:.3f}</td></tr>
-                <tr><td>Average Generation Time</td><td>{results.avg_generation_time:.3f}s</td></tr>
-                <tr><td>Average Execution Time</td><td>{results.avg_execution_time:.3f}s</td></tr>
-                <tr><td>Total Evaluation Time</td><td>{results.total_evaluation_time:.3f}s</td></tr>
+                <tr><td>Total Questions</td><td>{{ results.total_questions }}</td></tr>
+                <tr><td>Successful Generations</td><td>{{ results.successful_generations }}</td></tr>
+                <tr><td>Successful Executions</td><td>{{ results.successful_executions }}</td></tr>
+                <tr><td>Average Precision</td><td>{{ "%.3f"|format(results.avg_precision) }}</td></tr>
+                <tr><td>Average Recall</td><td>{{ "%.3f"|format(results.avg_recall) }}</td></tr>
+                <tr><td>Average Generation Time</td><td>{{ "%.3f"|format(results.avg_generation_time) }}s</td></tr>
+                <tr><td>Average Execution Time</td><td>{{ "%.3f"|format(results.avg_execution_time) }}s</td></tr>
+                <tr><td>Total Evaluation Time</td><td>{{ "%.3f"|format(results.total_evaluation_time) }}s</td></tr>
             </table>
         </div>
         
         <div class="section">
             <h2>Component-Level Analysis</h2>
-            {component_table}
+            {{ component_table|safe }}
         </div>
         
         <div class="section">
             <h2>Performance Metrics</h2>
-            {performance_metrics}
+            {{ performance_metrics|safe }}
         </div>
         
         <div class="section">
             <h2>Error Analysis</h2>
-            {error_analysis}
+            {{ error_analysis|safe }}
         </div>
         
-        {self._generate_failed_questions_section(results.failed_questions)}
+        {% if results.failed_questions %}
+        <div class="section">
+            <h2>Failed Questions</h2>
+            <p>The following questions failed during evaluation:</p>
+            <ul>{% for qid in results.failed_questions %}<li>{{ qid }}</li>{% endfor %}</ul>
+        </div>
+        {% endif %}
         
         <div class="footer">
             <p>Generated by Text-to-SQL Evaluation Framework</p>
@@ -295,9 +305,119 @@ class ReportGenerator:
     </div>
 </body>
 </html>
-        """
+""")
+
+_COMPARISON_TEMPLATE = _env.from_string("""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Model Comparison Report</title>
+    <style>{{ css|safe }}</style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>Model Comparison Report</h1>
+            <p>Generated: {{ generated_at }}</p>
+        </div>
+        
+        <div class="section">
+            <h2>Performance Comparison</h2>
+            {{ comparison_table|safe }}
+        </div>
+        
+        <div class="section">
+            <h2>Detailed Metrics</h2>
+            {{ performance_comparison|safe }}
+        </div>
+    </div>
+</body>
+</html>
+""")
+
 
-        return html_template
+class ReportGenerator:
+    """Generate comprehensive evaluation reports"""
+
+    def __init__(self):
+        self.template_dir = Path("eval/templates")
+        self.template_dir.mkdir(parents=True, exist_ok=True)
+
+    def generate_html_report(
+        self, results: AggregateEvaluationResults, output_dir: str = "results/reports"
+    ) -> str:
+        """Generate HTML report for evaluation results"""
+
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        # Generate filename with timestamp
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        generated_at = now.strftime("%Y-%m-%d %H:%M:%S")
+        filename = f"evaluation_report_{results.dataset_name}_{timestamp}.html"
+        filepath = output_path / filename
+
+        # Write HTML content section by section
+        with open(filepath, "w", encoding="utf-8", buffering=1 << 16) as f:
+            self._stream_report_html(results, generated_at, f.write)
+
+        logger.info(f"HTML report generated: {filepath}")
+        return str(filepath)
+
+    def generate_comparison_report(
+        self,
+        comparison_results: Dict[str, AggregateEvaluationResults],
+        output_dir: str = "results/reports",
+    ) -> str:
+        """Generate comparison report for multiple models"""
+
+        output_path = Path(output_dir)
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        # Generate filename with timestamp
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        generated_at = now.strftime("%Y-%m-%d %H:%M:%S")
+        filename = f"model_comparison_report_{timestamp}.html"
+        filepath = output_path / filename
+
+        # Write comparison HTML content section by section
+        with open(filepath, "w", encoding="utf-8", buffering=1 << 16) as f:
+            self._stream_comparison_html(comparison_results, generated_at, f.write)
+
+        logger.info(f"Comparison report generated: {filepath}")
+        return str(filepath)
+
+    def _stream_report_html(
+        self,
+        results: AggregateEvaluationResults,
+        generated_at: str,
+        write: Callable[[str], Any],
+    ) -> None:
+        """Write HTML content for single evaluation report in chunks"""
+
+        # Component scores table
+        component_table = self._generate_component_table(results.component_scores)
+
+        # Error analysis
+        error_analysis = self._generate_error_analysis(results.error_types)
+
+        # Performance metrics
+        performance_metrics = self._generate_performance_metrics(results)
+
+        stream = _REPORT_TEMPLATE.generate(
+            results=results,
+            css=_REPORT_CSS,
+            generated_at=generated_at,
+            component_table=component_table,
+            performance_metrics=performance_metrics,
+            error_analysis=error_analysis,
+        )
+        for chunk in stream:
+            write(chunk)
 
     def _generate_component_table(
         self, component_scores: Dict[str, Dict[str, float]]
@@ -306,37 +426,23 @@ class ReportGenerator:
         if not component_scores:
             return "<p>No component scores available</p>"
 
-        rows = ""
+        rows = []
         for component, scores in component_scores.items():
             if component == "overall":
                 continue
             precision = scores.get("precision", 0)
             recall = scores.get("recall", 0)
             f1 = scores.get("f1_score", 0)
+            name = html.escape(component.replace("_", " ").title())
 
-            rows += f"""
+            cells = "".join(
+                self._progress_cell(value) for value in (precision, recall, f1)
+            )
+            rows.append(f"""
             <tr>
-                <td>{component.replace("_", " ").title()}</td>
-                <td>
-                    <div class="progress-bar">
-                        <div class="progress-fill" style="width: {precision * 100}%"></div>
-                    </div>
-                    {precision:.3f}
-                </td>
-                <td>
-                    <div class="progress-bar">
-                        <div class="progress-fill" style="width: {recall * 100}%"></div>
-                    </div>
-                    {recall:.3f}
-                </td>
-                <td>
-                    <div class="progress-bar">
-                        <div class="progress-fill" style="width: {f1 * 100}%"></div>
-                    </div>
-                    {f1:.3f}
-                </td>
+                <td>{name}</td>{cells}
             </tr>
-            """
+            """)
 
         return f"""
         <table>
@@ -349,24 +455,32 @@ class ReportGenerator:
                 </tr>
             </thead>
             <tbody>
-                {rows}
+                {"".join(rows)}
             </tbody>
         </table>
         """
 
+    def _progress_cell(self, value: float) -> str:
+        """Generate a table cell with a progress bar for a 0-1 score"""
+        return f"""
+                <td>
+                    <div class="progress-bar">
+                        <div class="progress-fill" style="width: {value * 100}%"></div>
+                    </div>
+                    {value:.3f}
+                </td>"""
+
     def _generate_error_analysis(self, error_types: Dict[str, int]) -> str:
         """Generate error analysis HTML"""
         if not error_types:
             return "<p>No errors encountered during evaluation</p>"
 
-        error_items = ""
-        for error_type, count in error_types.items():
-            error_items += f"""
+        error_items = "".join(f"""
             <div class="error-item">
-                <span>{error_type.replace("_", " ").title()}</span>
+                <span>{html.escape(error_type.replace("_", " ").title())}</span>
                 <span class="error-count">{count}</span>
             </div>
-            """
+            """ for error_type, count in error_types.items())
 
         return f"""
         <div>
@@ -387,25 +501,13 @@ class ReportGenerator:
         </table>
         """
 
-    def _generate_failed_questions_section(self, failed_questions: List[str]) -> str:
-        """Generate failed questions section HTML"""
-        if not failed_questions:
-            return ""
-
-        failed_list = "".join([f"<li>{qid}</li>" for qid in failed_questions])
-
-        return f"""
-        <div class="section">
-            <h2>Failed Questions</h2>
-            <p>The following questions failed during evaluation:</p>
-            <ul>{failed_list}</ul>
-        </div>
-        """
-
-    def _generate_comparison_html(
-        self, comparison_results: Dict[str, AggregateEvaluationResults]
-    ) -> str:
-        """Generate comparison report HTML"""
+    def _stream_comparison_html(
+        self,
+        comparison_results: Dict[str, AggregateEvaluationResults],
+        generated_at: str,
+        write: Callable[[str], Any],
+    ) -> None:
+        """Write comparison report HTML in chunks"""
 
         # Create comparison table
         comparison_table = self._generate_comparison_table(comparison_results)
@@ -415,103 +517,20 @@ class ReportGenerator:
             comparison_results
         )
 
-        html_template = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Model Comparison Report</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-            color: #333;
-        }}
-        .container {{
-            max-width: 1400px;
-            margin: 0 auto;
-            background: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .header {{
-            text-align: center;
-            margin-bottom: 40px;
-            padding-bottom: 20px;
-            border-bottom: 2px solid #e0e0e0;
-        }}
-        .header h1 {{
-            color: #2c3e50;
-            margin: 0;
-            font-size: 2.5em;
-        }}
-        .comparison-table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin: 20px 0;
-            background: white;
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .comparison-table th {{
-            background: #3498db;
-            color: white;
-            padding: 15px;
-            text-align: center;
-            font-weight: 600;
-        }}
-        .comparison-table td {{
-            padding: 12px 15px;
-            text-align: center;
-            border-bottom: 1px solid #e0e0e0;
-        }}
-        .comparison-table tr:hover {{
-            background-color: #f8f9fa;
-        }}
-        .best-score {{
-            background-color: #d4edda;
-            font-weight: bold;
-            color: #155724;
-        }}
-        .metric-row {{
-            background-color: #f8f9fa;
-            font-weight: 600;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>Model Comparison Report</h1>
-            <p>Generated: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
-        </div>
-        
-        <div class="section">
-            <h2>Performance Comparison</h2>
-            {comparison_table}
-        </div>
-        
-        <div class="section">
-            <h2>Detailed Metrics</h2>
-            {performance_comparison}
-        </div>
-    </div>
-</body>
-</html>
-        """
-
-        return html_template
+        stream = _COMPARISON_TEMPLATE.generate(
+            css=_COMPARISON_CSS,
+            generated_at=generated_at,
+            comparison_table=comparison_table,
+            performance_comparison=performance_comparison,
+        )
+        for chunk in stream:
+            write(chunk)
 
     def _generate_comparison_table(
         self, comparison_results: Dict[str, AggregateEvaluationResults]
     ) -> str:
         """Generate model comparison table"""
-        models = list(comparison_results.keys())
+        models = [html.escape(model) for model in comparison_results]
 
         # Find best scores for highlighting
         best_f1 = max(results.avg_f1_score for results in comparison_results.values())
@@ -539,11 +558,12 @@ class ReportGenerator:
             ("Execution Time", lambda r: r.avg_execution_time, None),
         ]
 
-        table_rows = ""
+        table_rows = []
         for metric_name, metric_func, best_value in rows:
-            row = f'<tr class="metric-row"><td>{metric_name}</td>'
+            unit = "s" if "Time" in metric_name else ""
+            table_rows.append(f'<tr class="metric-row"><td>{metric_name}</td>')
 
-            for model, results in comparison_results.items():
+            for results in comparison_results.values():
                 value = metric_func(results)
 
                 # Highlight best score
@@ -552,19 +572,14 @@ class ReportGenerator:
                     if best_value is not None and abs(value - best_value) < 0.001
                     else ""
                 )
+                table_rows.append(f'<td class="{css_class}">{value:.3f}{unit}</td>')
 
-                if "Time" in metric_name:
-                    row += f'<td class="{css_class}">{value:.3f}s</td>'
-                else:
-                    row += f'<td class="{css_class}">{value:.3f}</td>'
-
-            row += "</tr>"
-            table_rows += row
+            table_rows.append("</tr>")
 
         return f"""
         <table class="comparison-table">
             <thead>{header_row}</thead>
-            <tbody>{table_rows}</tbody>
+            <tbody>{"".join(table_rows)}</tbody>
         </table>
         """
 
@@ -572,11 +587,11 @@ class ReportGenerator:
         self, comparison_results: Dict[str, AggregateEvaluationResults]
     ) -> str:
         """Generate detailed performance comparison"""
-        comparison_html = ""
+        sections = []
 
         for model, results in comparison_results.items():
-            comparison_html += f"""
-            <h3>{model}</h3>
+            sections.append(f"""
+            <h3>{html.escape(model)}</h3>
             <table>
                 <tr><th>Metric</th><th>Value</th></tr>
                 <tr><td>Total Questions</td><td>{results.total_questions}</td></tr>
@@ -584,6 +599,6 @@ class ReportGenerator:
                 <tr><td>Successful Executions</td><td>{results.successful_executions}</td></tr>
                 <tr><td>Failed Questions</td><td>{len(results.failed_questions)}</td></tr>
             </table>
-            """
+            """)
 
-        return comparison_html
+        return "".join(sections)
@@ -11,21 +11,26 @@ Provides an interactive interface for:
 
 import sys
 import os
+import time
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
-import json
+from dataclasses import replace
+from typing import List, Tuple
 from datetime import datetime
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from config.config import config
 from eval.benchmark import BenchmarkRunner
 from eval.datasets.dataset_loader import DatasetLoader
+from eval.evaluator import QuestionResultsSoA
 from eval.report_generator import ReportGenerator
+from src.utils.json_io import load_json
 from src.utils.logger import get_logger
 
 logger = get_logger("text2sql.evaluation_ui")
@@ -38,11 +43,23 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Fragments rerun only the decorated panel on interaction; Streamlit releases
+# without them fall back to ordinary full-script reruns
+_fragment = getattr(st, "fragment", None) or getattr(
+    st, "experimental_fragment", lambda fn: fn
+)
+
 
 # Initialize components
+@st.cache_resource
+def _results_dir() -> Path:
+    """Benchmark results directory, known without constructing a runner"""
+    return Path(config.EVALUATION_BENCHMARKS_DIR)
+
+
 @st.cache_resource
 def get_benchmark_runner():
-    return BenchmarkRunner()
+    return BenchmarkRunner(results_dir=str(_results_dir()))
 
 
 @st.cache_resource
@@ -55,6 +72,37 @@ def get_report_generator():
     return ReportGenerator()
 
 
+@st.cache_data(show_spinner=False)
+def _load_results(path: str, mtime: float) -> dict:
+    """Parse a result file; mtime is part of the key so edits invalidate it"""
+    return load_json(path)
+
+
+# Shared chart layouts; go.Figure copies them, so figures never mutate these
+_CHART_MARGIN = dict(l=40, r=10, t=40, b=40)
+_BAR_LAYOUT = go.Layout(
+    template="simple_white", margin=_CHART_MARGIN, yaxis_range=[0, 1]
+)
+_TREND_LAYOUT = go.Layout(template="simple_white", margin=_CHART_MARGIN)
+
+_BENCHMARK_COLUMNS = ["file", "dataset", "f1_score", "execution_success_rate"]
+_SCORE_DTYPES = {"f1_score": "float32", "execution_success_rate": "float32"}
+
+
+@st.cache_data(show_spinner=False)
+def _load_benchmark_frame(
+    results_dir: str, mtime_ns: int
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Benchmark table and score statistics, rebuilt only when results change"""
+    summary = get_benchmark_runner().get_benchmark_summary()
+
+    df = pd.DataFrame.from_records(
+        summary.get("benchmarks", []), columns=_BENCHMARK_COLUMNS
+    ).astype(_SCORE_DTYPES)
+    stats = df[list(_SCORE_DTYPES)].agg(["mean", "max"])
+    return df, stats
+
+
 def main():
     st.title("📊 Text-to-SQL Evaluation Dashboard")
     st.markdown(
@@ -211,16 +259,33 @@ def run_evaluation(
 
         # Limit questions if specified
         if max_questions < len(dataset.questions):
-            dataset.questions = dataset.questions[:max_questions]
-            dataset.total_questions = len(dataset.questions)
+            dataset = replace(
+                dataset,
+                questions=dataset.questions[:max_questions],
+                total_questions=max_questions,
+            )
 
         status_text.text(
             f"Running evaluation on {dataset.total_questions} questions..."
         )
         progress_bar.progress(30)
 
-        # Run evaluation
-        results = runner.evaluator.evaluate_dataset(dataset, model_name)
+        # Run evaluation, advancing the progress bar as questions complete
+        evaluator = runner.evaluator
+        start_time = time.time()
+        n = len(dataset.questions)
+        columns = QuestionResultsSoA(n)
+        for done, (i, result) in enumerate(
+            evaluator.evaluate_dataset_iter(dataset, model_name), 1
+        ):
+            if result is not None:
+                columns.record(i, result)
+            progress_bar.progress(30 + int(60 * done / n))
+            status_text.text(f"Evaluated {done}/{n} questions...")
+
+        results = evaluator.build_aggregate_results(
+            dataset, columns, time.time() - start_time
+        )
 
         progress_bar.progress(90)
         status_text.text("Generating report...")
@@ -311,34 +376,38 @@ def display_results_summary(results, report_path):
     st.markdown(f"📊 [View detailed HTML report](file://{report_path})")
 
 
+@_fragment
 def view_results_tab():
     st.header("📈 View Evaluation Results")
 
-    runner = get_benchmark_runner()
-
     # Get available results
-    results_dir = Path(runner.results_dir)
+    results_dir = _results_dir()
     if not results_dir.exists():
         st.warning("No evaluation results found. Run an evaluation first.")
         return
 
-    result_files = list(results_dir.glob("evaluation_*.json"))
-    if not result_files:
+    # One directory scan; each file is stat'ed once and reused below
+    with os.scandir(results_dir) as it:
+        mtimes = {
+            Path(entry.path): entry.stat().st_mtime
+            for entry in it
+            if entry.name.startswith("evaluation_") and entry.name.endswith(".json")
+        }
+    if not mtimes:
         st.warning("No evaluation files found.")
         return
 
     # Select result file
-    result_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
+    result_files = sorted(mtimes, key=mtimes.get, reverse=True)
     selected_file = st.selectbox(
         "Select Result File",
         options=result_files,
-        format_func=lambda x: f"{x.stem} ({datetime.fromtimestamp(x.stat().st_mtime).strftime('%Y-%m-%d %H:%M')})",
+        format_func=lambda x: f"{x.stem} ({datetime.fromtimestamp(mtimes[x]).strftime('%Y-%m-%d %H:%M')})",
     )
 
     if selected_file:
         try:
-            with open(selected_file, "r") as f:
-                results_data = json.load(f)
+            results_data = _load_results(str(selected_file), mtimes[selected_file])
 
             display_historical_results(results_data)
 
@@ -346,6 +415,17 @@ def view_results_tab():
             st.error(f"Error loading results: {str(e)}")
 
 
+def _bar_chart(
+    x: List[str], y: List[float], title: str, x_label: str, y_label: str
+) -> go.Figure:
+    """Bar chart of scores in [0, 1] on the shared layout"""
+    # Typed arrays serialize to the browser without per-value boxing
+    bar = go.Bar(x=np.asarray(x, dtype=np.str_), y=np.asarray(y, dtype=np.float32))
+    fig = go.Figure(bar, layout=_BAR_LAYOUT)
+    fig.update_layout(title=title, xaxis_title=x_label, yaxis_title=y_label)
+    return fig
+
+
 def display_historical_results(results_data):
     """Display historical evaluation results"""
 
@@ -379,14 +459,8 @@ def display_historical_results(results_data):
         results_data.get("avg_result_accuracy", 0),
     ]
 
-    fig = px.bar(
-        x=metrics,
-        y=values,
-        title="Evaluation Metrics",
-        labels={"x": "Metric", "y": "Score"},
-    )
-    fig.update_layout(yaxis_range=[0, 1])
-    st.plotly_chart(fig, use_container_width=True)
+    fig = _bar_chart(metrics, values, "Evaluation Metrics", "Metric", "Score")
+    st.plotly_chart(fig, use_container_width=True, key="historical_metrics")
 
     # Component analysis
     if "component_scores" in results_data:
@@ -404,16 +478,19 @@ def display_historical_results(results_data):
                     f1_scores.append(scores.get("f1_score", 0))
 
             if components:
-                fig = px.bar(
-                    x=components,
-                    y=f1_scores,
-                    title="Component F1 Scores",
-                    labels={"x": "Component", "y": "F1 Score"},
+                fig = _bar_chart(
+                    components,
+                    f1_scores,
+                    "Component F1 Scores",
+                    "Component",
+                    "F1 Score",
+                )
+                st.plotly_chart(
+                    fig, use_container_width=True, key="historical_components"
                 )
-                fig.update_layout(yaxis_range=[0, 1])
-                st.plotly_chart(fig, use_container_width=True)
 
 
+@_fragment
 def compare_models_tab(dataset_name, database_url):
     st.header("⚖️ Compare Models")
 
@@ -429,7 +506,7 @@ def compare_models_tab(dataset_name, database_url):
             help="Enter model names, one per line",
         )
 
-        models = [m.strip() for m in models_input.split("\n") if m.strip()]
+        models = list(filter(None, map(str.strip, models_input.splitlines())))
 
         # Comparison parameters
         with st.expander("Comparison Settings"):
@@ -464,11 +541,23 @@ def run_model_comparison(dataset_name, models, max_questions):
             dataset = dataset_loader.load_custom_dataset(f"{dataset_name}.json")
 
             if max_questions < len(dataset.questions):
-                dataset.questions = dataset.questions[:max_questions]
-                dataset.total_questions = len(dataset.questions)
+                dataset = replace(
+                    dataset,
+                    questions=dataset.questions[:max_questions],
+                    total_questions=max_questions,
+                )
+
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+
+            def on_model_done(model_name, completed, total):
+                progress_bar.progress(completed / total)
+                status_text.text(f"Finished {model_name} ({completed}/{total})")
 
-            # Run comparison
-            comparison_results = runner.run_model_comparison(dataset_name, models)
+            # Run comparison on the truncated dataset, one worker per model
+            comparison_results = runner.run_model_comparison(
+                dataset_name, models, dataset=dataset, progress_callback=on_model_done
+            )
 
             # Display results
             display_comparison_results(comparison_results)
@@ -506,62 +595,53 @@ def display_comparison_results(comparison_results):
     models = list(comparison_results.keys())
     f1_scores = [results.avg_f1_score for results in comparison_results.values()]
 
-    fig = px.bar(
-        x=models,
-        y=f1_scores,
-        title="F1 Score Comparison",
-        labels={"x": "Model", "y": "F1 Score"},
+    fig = _bar_chart(models, f1_scores, "F1 Score Comparison", "Model", "F1 Score")
+    st.plotly_chart(fig, use_container_width=True, key="comparison_f1")
+
+
+def _trend_chart(values: pd.Series, title: str, y_label: str) -> go.Figure:
+    """Line chart over benchmark index, rendered with WebGL"""
+    fig = go.Figure(
+        go.Scattergl(x=values.index.to_numpy(), y=values.to_numpy(), mode="lines"),
+        layout=_TREND_LAYOUT,
     )
-    fig.update_layout(yaxis_range=[0, 1])
-    st.plotly_chart(fig, use_container_width=True)
+    fig.update_layout(title=title, xaxis_title="Benchmark Index", yaxis_title=y_label)
+    return fig
 
 
+@_fragment
 def analytics_tab():
     st.header("📊 Analytics Dashboard")
 
-    runner = get_benchmark_runner()
-
-    # Get benchmark summary
-    summary = runner.get_benchmark_summary()
-
-    if "benchmarks" not in summary:
+    # The runner is only built (inside the cached loader) when results changed
+    results_dir = _results_dir()
+    try:
+        mtime_ns = os.stat(results_dir).st_mtime_ns
+    except OSError:
         st.warning("No benchmark data available for analytics.")
         return
 
-    benchmarks = summary["benchmarks"]
+    df, stats = _load_benchmark_frame(str(results_dir), mtime_ns)
 
-    if not benchmarks:
+    if df.empty:
         st.warning("No benchmarks found.")
         return
 
-    # Convert to DataFrame for analysis
-    df = pd.DataFrame(benchmarks)
-    df["f1_score"] = pd.to_numeric(df["f1_score"])
-    df["execution_success_rate"] = pd.to_numeric(df["execution_success_rate"])
-
     # Performance trends
     st.subheader("📈 Performance Trends")
 
     if len(df) > 1:
         # F1 Score trend
-        fig_f1 = px.line(
-            df,
-            x=df.index,
-            y="f1_score",
-            title="F1 Score Trend Over Time",
-            labels={"x": "Benchmark Index", "y": "F1 Score"},
-        )
-        st.plotly_chart(fig_f1, use_container_width=True)
+        fig_f1 = _trend_chart(df["f1_score"], "F1 Score Trend Over Time", "F1 Score")
+        st.plotly_chart(fig_f1, use_container_width=True, key="analytics_f1_trend")
 
         # Execution success trend
-        fig_exec = px.line(
-            df,
-            x=df.index,
-            y="execution_success_rate",
-            title="Execution Success Rate Trend",
-            labels={"x": "Benchmark Index", "y": "Execution Success Rate"},
+        fig_exec = _trend_chart(
+            df["execution_success_rate"],
+            "Execution Success Rate Trend",
+            "Execution Success Rate",
         )
-        st.plotly_chart(fig_exec, use_container_width=True)
+        st.plotly_chart(fig_exec, use_container_width=True, key="analytics_exec_trend")
 
     # Summary statistics
     st.subheader("📊 Summary Statistics")
@@ -570,12 +650,13 @@ def analytics_tab():
 
     with col1:
         st.metric("Total Benchmarks", len(df))
-        st.metric("Average F1 Score", f"{df['f1_score'].mean():.3f}")
+        st.metric("Average F1 Score", f"{stats.at['mean', 'f1_score']:.3f}")
 
     with col2:
-        st.metric("Best F1 Score", f"{df['f1_score'].max():.3f}")
+        st.metric("Best F1 Score", f"{stats.at['max', 'f1_score']:.3f}")
         st.metric(
-            "Average Execution Success", f"{df['execution_success_rate'].mean():.3f}"
+            "Average Execution Success",
+            f"{stats.at['mean', 'execution_success_rate']:.3f}",
         )
 
 
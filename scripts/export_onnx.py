@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Export the generator model to ONNX for ONNX Runtime serving on CPU
+
+Usage:
+    python scripts/export_onnx.py
+    python scripts/export_onnx.py --model google/flan-t5-base --quantize avx2
+
+Requires the 'onnx' extra (optimum[onnxruntime]). Set USE_ONNX=true to serve
+the exported model; T2SQLGenerator falls back to PyTorch when it is missing.
+"""
+
+import sys
+import os
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config.config import config
+from src.nlp.generator import onnx_model_dir
+from src.utils.logger import get_logger
+
+logger = get_logger("text2sql.export_onnx")
+
+QUANTIZATION_TARGETS = ["none", "avx2", "avx512", "avx512_vnni", "arm64"]
+
+
+def export(model_name: str, optimization_level: int, quantize: str) -> Path:
+    """
+    Export, optimize and optionally quantize a Seq2Seq model
+
+    Args:
+        model_name: HuggingFace model identifier
+        optimization_level: ONNX Runtime graph optimization level (0-99)
+        quantize: Dynamic int8 quantization target, or "none"
+
+    Returns:
+        Directory containing the exported model
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTOptimizer, ORTQuantizer
+    from optimum.onnxruntime.configuration import (
+        AutoQuantizationConfig,
+        OptimizationConfig,
+    )
+    from transformers import AutoTokenizer
+
+    output_dir = onnx_model_dir(model_name)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Separate decoder graphs with and without past key values; the optimizer
+    # does not support the merged decoder
+    logger.info("Exporting %s to ONNX", model_name)
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        model_name,
+        export=True,
+        use_cache=True,
+        use_merged=False,
+        cache_dir=config.MODEL_CACHE_DIR,
+    )
+    tokenizer = AutoTokenizer.from_pretrained(
+        model_name, cache_dir=config.MODEL_CACHE_DIR
+    )
+
+    if optimization_level > 0:
+        # Graph fusions: LayerNorm, attention and GELU
+        logger.info("Optimizing ONNX graphs (level %d)", optimization_level)
+        ORTOptimizer.from_pretrained(model).optimize(
+            save_dir=output_dir,
+            optimization_config=OptimizationConfig(
+                optimization_level=optimization_level
+            ),
+        )
+    else:
+        model.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+
+    if quantize != "none":
+        logger.info("Quantizing ONNX graphs to int8 for %s", quantize)
+        qconfig = getattr(AutoQuantizationConfig, quantize)(
+            is_static=False, per_channel=False
+        )
+        for onnx_file in sorted(output_dir.glob("*.onnx")):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                ORTQuantizer.from_pretrained(
+                    output_dir, file_name=onnx_file.name
+                ).quantize(save_dir=tmp_dir, quantization_config=qconfig)
+                # Replace the graph in place so the generator loads it unchanged
+                quantized = next(Path(tmp_dir).glob("*.onnx"))
+                os.replace(quantized, onnx_file)
+
+    logger.info("ONNX model written to %s", output_dir)
+    return output_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the model to ONNX Runtime")
+    parser.add_argument(
+        "--model",
+        type=str,
+        default=config.MODEL_NAME,
+        help="Language model name to export",
+    )
+    parser.add_argument(
+        "--optimization-level",
+        type=int,
+        default=2,
+        help="ONNX Runtime graph optimization level; 0 disables optimization",
+    )
+    parser.add_argument(
+        "--quantize",
+        type=str,
+        choices=QUANTIZATION_TARGETS,
+        default="none",
+        help="Dynamic int8 quantization target for the exported graphs",
+    )
+    args = parser.parse_args()
+
+    try:
+        output_dir = export(args.model, args.optimization_level, args.quantize)
+    except ImportError:
+        logger.error(
+            "optimum is not installed; install the 'onnx' extra to export models"
+        )
+        sys.exit(1)
+
+    print(f"Exported {args.model} to {output_dir}")
+    print("Set USE_ONNX=true to serve it with ONNX Runtime")
+
+
+if __name__ == "__main__":
+    main()
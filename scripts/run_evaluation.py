@@ -17,6 +17,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from config.config import configure
 from eval.benchmark import BenchmarkRunner
 from eval.datasets.dataset_loader import DatasetLoader
 from src.utils.logger import get_logger
@@ -81,6 +82,8 @@ def main():
 
     args = parser.parse_args()
 
+    configure()
+
     if args.verbose:
         logger.setLevel("DEBUG")
 
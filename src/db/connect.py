@@ -1,5 +1,43 @@
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+import functools
+import os
 
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import StaticPool
+
+# Per-connection read tuning; WAL itself is persistent and set when seeding
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+)
+
+def _apply_sqlite_pragmas(dbapi_conn, _record) -> None:
+    cursor = dbapi_conn.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+def tune_sqlite_engine(engine: Engine) -> Engine:
+    """Apply SQLITE_PRAGMAS to every new connection of a file-backed SQLite engine"""
+    url = engine.url
+    if url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:"):
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+@functools.lru_cache(maxsize=8)
 def get_engine(url: str = "sqlite:///data/demo.sqlite") -> Engine:
-    return create_engine(url, future=True)
+    # One engine per URL for the whole process; callers share its pool
+    parsed = make_url(url)
+    kwargs = {"future": True}
+    if parsed.get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if parsed.database in (None, "", ":memory:"):
+            # Every new connection would see a fresh in-memory database
+            kwargs["poolclass"] = StaticPool
+    else:
+        kwargs.update(pool_pre_ping=True, pool_size=max(4, os.cpu_count() or 1))
+    return tune_sqlite_engine(create_engine(url, **kwargs))
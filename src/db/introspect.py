@@ -1,12 +1,47 @@
+import functools
+
 from sqlalchemy import inspect
 from sqlalchemy.engine import Engine
 
-def get_schema_summary(engine: Engine) -> tuple[list[str], dict[str, list[str]]]:
+from src.db.connect import get_engine
+
+# Immutable (tables, ((table, columns), ...)) form, safe to share from a cache
+_Schema = tuple[tuple[str, ...], tuple[tuple[str, tuple[str, ...]], ...]]
+
+@functools.lru_cache(maxsize=32)
+def _get_schema_cached(url: str) -> _Schema:
+    return _introspect(get_engine(url))
+
+def _introspect(engine: Engine) -> _Schema:
     insp = inspect(engine)
-    tables = insp.get_table_names()
-    cols = {t: [c["name"] for c in insp.get_columns(t)] for t in tables}
+    tables = tuple(insp.get_table_names())
+    cols = tuple((t, tuple(c["name"] for c in insp.get_columns(t))) for t in tables)
     return tables, cols
 
+def _schema_for(engine: Engine) -> _Schema:
+    # In-memory databases are private to their engine, so they can't be shared by URL
+    if engine.url.database in (None, "", ":memory:"):
+        return _introspect(engine)
+    return _get_schema_cached(engine.url.render_as_string(hide_password=False))
+
+def get_schema_summary(engine: Engine) -> tuple[list[str], dict[str, list[str]]]:
+    tables, cols = _schema_for(engine)
+    return list(tables), {t: list(c) for t, c in cols}
+
+@functools.lru_cache(maxsize=16)
+def _compact_schema_cached(schema: _Schema) -> str:
+    tables, cols = schema
+    return to_compact_schema(list(tables), dict(cols))
+
+def precompute_schema(engine: Engine) -> str:
+    """Compact prompt schema for an engine, built once per distinct schema"""
+    return _compact_schema_cached(_schema_for(engine))
+
+def clear_schema_cache() -> None:
+    """Forget cached schemas, e.g. after running migrations in-process"""
+    _get_schema_cached.cache_clear()
+    _compact_schema_cached.cache_clear()
+
 def to_compact_schema(tables: list[str], cols: dict[str, list[str]]) -> str:
     lines = ["tables:"]
     for t in tables:
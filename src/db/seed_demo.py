@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
 from pathlib import Path
 
 DB_PATH = "data/demo.sqlite"
@@ -58,13 +58,16 @@ INSERT INTO items(id, order_id, sku, price) VALUES
 def main():
     Path("data").mkdir(parents=True, exist_ok=True)
     eng = create_engine(f"sqlite:///{DB_PATH}", future=True)
-    with eng.begin() as conn:
-        for stmt in DDL_SQL.strip().split(";"):
-            if stmt.strip():
-                conn.execute(text(stmt))
-        for stmt in SEED_SQL.strip().split(";"):
-            if stmt.strip():
-                conn.execute(text(stmt))
+    # sqlite3 runs the whole script in one call; wrap it so seeding is atomic
+    raw = eng.raw_connection()
+    try:
+        # WAL is stored in the database file, so readers get it from here on.
+        # Set locally: this runs as a plain script, without src on sys.path
+        raw.driver_connection.execute("PRAGMA journal_mode=WAL")
+        raw.driver_connection.execute("PRAGMA synchronous=NORMAL")
+        raw.driver_connection.executescript(f"BEGIN;\n{DDL_SQL}\n{SEED_SQL}\nCOMMIT;")
+    finally:
+        raw.close()
     print(f"✅ Demo DB created at {DB_PATH}")
 
 if __name__ == "__main__":
@@ -1,14 +1,102 @@
+import threading
 import torch
 import time
-from typing import Optional, Dict, Any
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-from src.nlp.prompt import build_prompt
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+from transformers import (
+    AutoTokenizer,
+    AutoModelForSeq2SeqLM,
+    StopStringCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer,
+)
+from src.nlp.prompt import build_prefix, build_suffix
 from src.nlp.fewshots import FEWSHOTS
+from src.utils.hashing import cache_key_hash
 from src.utils.logger import get_logger, log_performance
 from config.config import config
 
+try:
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+except ImportError:  # Optional: serve an ONNX export with ONNX Runtime
+    ORTModelForSeq2SeqLM = None
+
 logger = get_logger("text2sql.generator")
 
+# Text after the end of the first statement is never used, so stop decoding there
+SQL_STOP_STRINGS = [";", "\n\n"]
+
+# Tokenized prompt prefixes kept per generator, one per distinct schema
+_MAX_CACHED_PREFIXES = 16
+
+
+def _from_pretrained(loader, model_name: str, **kwargs):
+    """Load from the local model cache, downloading only on a cache miss"""
+    try:
+        return loader.from_pretrained(
+            model_name,
+            cache_dir=config.MODEL_CACHE_DIR,
+            local_files_only=True,
+            **kwargs,
+        )
+    except OSError:
+        return loader.from_pretrained(
+            model_name, cache_dir=config.MODEL_CACHE_DIR, **kwargs
+        )
+
+
+def _model_dtype() -> torch.dtype:
+    """Pick the weight dtype for the current device and configuration"""
+    if config.QUANTIZATION != "none" and not torch.cuda.is_available():
+        # Dynamic int8 quantization on CPU starts from fp32 weights
+        return torch.float32
+    if config.USE_BF16:
+        return torch.bfloat16
+    return torch.float16 if torch.cuda.is_available() else torch.float32
+
+
+def _decoding_budget(
+    question: str, max_new_tokens: int, num_beams: Optional[int]
+) -> Tuple[int, int]:
+    """Scale the token budget down for short questions and pick the beam count"""
+    # Short questions produce short SQL; the floor leaves room for a join or GROUP BY
+    budget = min(max_new_tokens, 64 + 8 * len(question.split()))
+    if num_beams is None:
+        # Beam search pays a KV-cache reorder per step for little gain on short
+        # queries; an explicit beam count from the caller is always kept
+        num_beams = 1 if len(question) < 40 else config.NUM_BEAMS
+    return budget, num_beams
+
+
+def _quantization_kwargs() -> Dict[str, Any]:
+    """from_pretrained arguments for bitsandbytes quantization on CUDA"""
+    if config.QUANTIZATION == "none" or not torch.cuda.is_available():
+        return {}
+
+    # Imported lazily: constructing the config requires bitsandbytes
+    from transformers import BitsAndBytesConfig
+
+    if config.QUANTIZATION == "int8":
+        quantization_config = BitsAndBytesConfig(load_in_8bit=True)
+    else:
+        quantization_config = BitsAndBytesConfig(
+            load_in_4bit=True, bnb_4bit_compute_dtype=torch.bfloat16
+        )
+    return {"quantization_config": quantization_config, "device_map": "auto"}
+
+
+def onnx_model_dir(model_name: str) -> Path:
+    """Directory scripts/export_onnx.py exports model_name to"""
+    return Path(config.MODEL_CACHE_DIR) / "onnx" / model_name.replace("/", "--")
+
+
+def prefetch_model(model_name: str) -> None:
+    """Download a model and tokenizer into MODEL_CACHE_DIR ahead of time"""
+    _from_pretrained(AutoTokenizer, model_name)
+    _from_pretrained(AutoModelForSeq2SeqLM, model_name, low_cpu_mem_usage=True)
+    logger.info("Model cache warmed for %s", model_name)
+
 
 class T2SQLGenerator:
     """Optimized Text-to-SQL Generator with caching and performance monitoring"""
@@ -30,6 +118,7 @@ class T2SQLGenerator:
         enable_caching: bool = None,
     ):
         if hasattr(self, "_initialized"):
+            # Shared singleton: callers with another schema pass it per call
             return
 
         self.schema_txt = schema_txt
@@ -41,8 +130,23 @@ class T2SQLGenerator:
             else config.ENABLE_MODEL_CACHING
         )
 
-        logger.info(f"Initializing T2SQLGenerator with model: {self.model_name}")
+        logger.info("Initializing T2SQLGenerator with model: %s", self.model_name)
         self._load_model()
+
+        # Rules, schema and examples are tokenized once per schema; schema_txt is
+        # the default for calls that do not pass their own
+        self._schema_hash = cache_key_hash(schema_txt)
+        self._prefix_ids: OrderedDict[int, List[int]] = OrderedDict()
+        # LRU cache of generated SQL keyed by schema, question and decoding settings
+        self._sql_cache: OrderedDict[tuple, str] = OrderedDict()
+        self._sql_cache_lock = threading.Lock()
+        # The instance is shared across request threads; generate() is not reentrant
+        self._generate_lock = threading.Lock()
+
+        # Built once: the criteria precompute token tables from the vocabulary
+        self._stopping_criteria = StoppingCriteriaList(
+            [StopStringCriteria(self.tok, SQL_STOP_STRINGS)]
+        )
         self._initialized = True
 
     @log_performance
@@ -59,22 +163,32 @@ class T2SQLGenerator:
             logger.info("Loading model from HuggingFace")
             try:
                 # Load tokenizer
-                self.tok = AutoTokenizer.from_pretrained(
-                    self.model_name, cache_dir=config.MODEL_CACHE_DIR
-                )
+                self.tok = _from_pretrained(AutoTokenizer, self.model_name)
 
-                # Load model with optimizations
-                self.model = AutoModelForSeq2SeqLM.from_pretrained(
-                    self.model_name,
-                    cache_dir=config.MODEL_CACHE_DIR,
-                    torch_dtype=torch.float16
-                    if torch.cuda.is_available()
-                    else torch.float32,
-                    low_cpu_mem_usage=True,
-                )
+                onnx_dir = onnx_model_dir(self.model_name)
+                if config.USE_ONNX and self._onnx_available(onnx_dir):
+                    self.model = ORTModelForSeq2SeqLM.from_pretrained(
+                        onnx_dir, provider="CPUExecutionProvider"
+                    )
+                    logger.info("Loaded ONNX Runtime model from %s", onnx_dir)
+                else:
+                    # Load model with optimizations
+                    self.model = _from_pretrained(
+                        AutoModelForSeq2SeqLM,
+                        self.model_name,
+                        torch_dtype=_model_dtype(),
+                        low_cpu_mem_usage=True,
+                        **_quantization_kwargs(),
+                    )
+
+                    # Set model to evaluation mode
+                    self.model.eval()
 
-                # Set model to evaluation mode
-                self.model.eval()
+                    if config.QUANTIZATION != "none" and not torch.cuda.is_available():
+                        self._quantize_dynamic()
+
+                    if config.ENABLE_COMPILE:
+                        self._compile_model()
 
                 # Cache the model if enabled
                 if self.enable_caching:
@@ -87,9 +201,119 @@ class T2SQLGenerator:
                 logger.info("Model loaded successfully")
 
             except Exception as e:
-                logger.error(f"Failed to load model: {str(e)}")
+                logger.error("Failed to load model: %s", e)
                 raise
 
+    @staticmethod
+    def _onnx_available(onnx_dir: Path) -> bool:
+        """Whether an ONNX export can be served, falling back to PyTorch if not"""
+        if ORTModelForSeq2SeqLM is None:
+            logger.warning("USE_ONNX is set but optimum is not installed")
+            return False
+        if not onnx_dir.exists():
+            logger.warning(
+                "USE_ONNX is set but %s does not exist; run scripts/export_onnx.py",
+                onnx_dir,
+            )
+            return False
+        return True
+
+    def _quantize_dynamic(self):
+        """Quantize linear layers to int8 for CPU inference, keeping embeddings fp32"""
+        if config.QUANTIZATION == "int4":
+            logger.warning("int4 quantization needs CUDA; using int8 on CPU instead")
+
+        self.model = torch.ao.quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        logger.info("Model linear layers quantized to int8")
+
+    def _compile_model(self):
+        """Compile the forward pass and pay the compile cost before first use"""
+        self.model.forward = torch.compile(
+            self.model.forward, mode="reduce-overhead", dynamic=True
+        )
+
+        # Warm up so the first real request doesn't trigger compilation
+        warmup_ids = self.tok("SELECT 1", return_tensors="pt").input_ids
+        with torch.inference_mode():
+            self.model.generate(warmup_ids, max_new_tokens=4)
+        logger.info("Model compiled with torch.compile")
+
+    def _decoding_kwargs(self, num_beams: int) -> Dict[str, Any]:
+        """Deterministic generate() arguments for greedy or beam search decoding"""
+        if num_beams > 1:
+            # Beam search reorders the KV cache every step, so it is opt-in only
+            return {
+                "num_beams": num_beams,
+                "do_sample": False,
+                "early_stopping": True,
+                "stopping_criteria": self._stopping_criteria,
+            }
+
+        return {
+            "num_beams": 1,
+            "do_sample": False,
+            "use_cache": True,
+            "stopping_criteria": self._stopping_criteria,
+        }
+
+    def _prompt_prefix(self, schema_txt: Optional[str]) -> Tuple[int, List[int]]:
+        """Schema hash and tokenized prompt prefix, defaulting to self.schema_txt"""
+        if schema_txt is None:
+            schema_txt, schema_hash = self.schema_txt, self._schema_hash
+        else:
+            schema_hash = cache_key_hash(schema_txt)
+
+        with self._sql_cache_lock:
+            prefix_ids = self._prefix_ids.get(schema_hash)
+            if prefix_ids is not None:
+                self._prefix_ids.move_to_end(schema_hash)
+                return schema_hash, prefix_ids
+
+        prefix_ids = self.tok(
+            build_prefix(schema_txt, self.fewshots), add_special_tokens=False
+        ).input_ids
+        with self._sql_cache_lock:
+            self._prefix_ids[schema_hash] = prefix_ids
+            if len(self._prefix_ids) > _MAX_CACHED_PREFIXES:
+                self._prefix_ids.popitem(last=False)
+        return schema_hash, prefix_ids
+
+    def _encode_prompts(self, questions: List[str], prefix_ids: List[int]):
+        """Append the tokenized questions to the pre-tokenized prompt prefix"""
+        # Leave room for the special tokens, as truncation=True would
+        max_content = config.MAX_INPUT_LENGTH - self.tok.num_special_tokens_to_add()
+
+        suffixes = self.tok(
+            [build_suffix(q) for q in questions], add_special_tokens=False
+        ).input_ids
+
+        input_ids = [
+            self.tok.build_inputs_with_special_tokens(
+                (prefix_ids + suffix_ids)[:max_content]
+            )
+            for suffix_ids in suffixes
+        ]
+
+        return self.tok.pad({"input_ids": input_ids}, return_tensors="pt")
+
+    def _get_cached_sql(self, key: tuple) -> Optional[str]:
+        """Return cached SQL for a generation key, if any"""
+        with self._sql_cache_lock:
+            sql = self._sql_cache.get(key)
+            if sql is not None:
+                self._sql_cache.move_to_end(key)
+            return sql
+
+    def _cache_sql(self, key: tuple, sql: str) -> None:
+        """Store generated SQL, evicting the least recently used entry"""
+        with self._sql_cache_lock:
+            self._sql_cache[key] = sql
+            self._sql_cache.move_to_end(key)
+            if len(self._sql_cache) > config.SQL_CACHE_SIZE:
+                self._sql_cache.popitem(last=False)
+
     @log_performance
     def generate(
         self,
@@ -97,6 +321,7 @@ class T2SQLGenerator:
         max_new_tokens: int = None,
         num_beams: int = None,
         timeout: int = None,
+        schema_txt: Optional[str] = None,
     ) -> str:
         """
         Generate SQL from natural language question
@@ -104,61 +329,203 @@ class T2SQLGenerator:
         Args:
             question: Natural language question
             max_new_tokens: Maximum tokens to generate
-            num_beams: Number of beams for generation
+            num_beams: Number of beams; chosen per question length when omitted
             timeout: Generation timeout in seconds
+            schema_txt: Prompt schema; defaults to the one given at construction
 
         Returns:
             Generated SQL query
         """
-        max_new_tokens = max_new_tokens or config.MAX_TOKENS
-        num_beams = num_beams or config.NUM_BEAMS
+        max_new_tokens, num_beams = _decoding_budget(
+            question, max_new_tokens or config.MAX_TOKENS, num_beams
+        )
         timeout = timeout or config.QUERY_TIMEOUT
 
-        logger.info(f"Generating SQL for question: '{question[:50]}...'")
+        schema_hash, prefix_ids = self._prompt_prefix(schema_txt)
+        cache_key = (schema_hash, question.strip(), max_new_tokens, num_beams)
+        sql = self._get_cached_sql(cache_key)
+        if sql is not None:
+            logger.info("SQL cache hit for question: '%.50s...'", question)
+            return sql
 
-        try:
-            # Build prompt
-            prompt = build_prompt(self.schema_txt, question, self.fewshots)
+        logger.info("Generating SQL for question: '%.50s...'", question)
 
-            # Tokenize with proper length limits
-            ids = self.tok(
-                prompt,
-                return_tensors="pt",
-                truncation=True,
-                max_length=config.MAX_INPUT_LENGTH,
-            ).input_ids
+        try:
+            enc = self._encode_prompts([question], prefix_ids)
 
             # Generate with timeout
-            start_time = time.time()
-            with torch.inference_mode():
+            start_ns = time.perf_counter_ns()
+            with self._generate_lock, torch.inference_mode():
                 out = self.model.generate(
-                    ids,
+                    input_ids=enc.input_ids,
+                    attention_mask=enc.attention_mask,
                     max_new_tokens=max_new_tokens,
-                    num_beams=num_beams,
-                    do_sample=False,  # Deterministic output
-                    early_stopping=True,
                     pad_token_id=self.tok.eos_token_id,
+                    **self._decoding_kwargs(num_beams),
                 )
 
-            generation_time = time.time() - start_time
+            generation_time = (time.perf_counter_ns() - start_ns) / 1e9
 
             # Decode result
             sql = self.tok.decode(out[0], skip_special_tokens=True).strip()
 
-            logger.info(f"SQL generated in {generation_time:.3f}s: {sql[:100]}...")
+            logger.info("SQL generated in %.3fs: %.100s...", generation_time, sql)
 
             # Check timeout
             if generation_time > timeout:
                 logger.warning(
-                    f"Generation took {generation_time:.3f}s (timeout: {timeout}s)"
+                    "Generation took %.3fs (timeout: %ss)", generation_time, timeout
                 )
 
+            self._cache_sql(cache_key, sql)
+
             return sql
 
         except Exception as e:
-            logger.error(f"SQL generation failed: {str(e)}")
+            logger.error("SQL generation failed: %s", e)
             raise
 
+    def generate_stream(
+        self,
+        question: str,
+        max_new_tokens: int = None,
+        schema_txt: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        Generate SQL greedily, yielding text as soon as it is decoded
+
+        Args:
+            question: Natural language question
+            max_new_tokens: Maximum tokens to generate
+            schema_txt: Prompt schema; defaults to the one given at construction
+
+        Yields:
+            Consecutive pieces of the generated SQL query
+        """
+        max_new_tokens, _ = _decoding_budget(
+            question, max_new_tokens or config.MAX_TOKENS, 1
+        )
+
+        schema_hash, prefix_ids = self._prompt_prefix(schema_txt)
+        cache_key = (schema_hash, question.strip(), max_new_tokens, 1)
+        sql = self._get_cached_sql(cache_key)
+        if sql is not None:
+            yield sql
+            return
+
+        enc = self._encode_prompts([question], prefix_ids)
+        streamer = TextIteratorStreamer(
+            self.tok,
+            skip_prompt=True,
+            skip_special_tokens=True,
+            timeout=config.QUERY_TIMEOUT,
+        )
+        errors: List[Exception] = []
+
+        def _run():
+            # inference_mode is thread-local, so enter it on the worker thread
+            try:
+                with self._generate_lock, torch.inference_mode():
+                    self.model.generate(
+                        input_ids=enc.input_ids,
+                        attention_mask=enc.attention_mask,
+                        max_new_tokens=max_new_tokens,
+                        pad_token_id=self.tok.eos_token_id,
+                        streamer=streamer,
+                        **self._decoding_kwargs(1),
+                    )
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+
+        thread = threading.Thread(target=_run, name="sql-stream", daemon=True)
+        thread.start()
+
+        pieces = []
+        for piece in streamer:
+            pieces.append(piece)
+            yield piece
+        thread.join()
+
+        if errors:
+            logger.error("Streaming SQL generation failed: %s", errors[0])
+            raise errors[0]
+
+        self._cache_sql(cache_key, "".join(pieces).strip())
+
+    @log_performance
+    def generate_batch(
+        self,
+        questions: List[str],
+        max_new_tokens: int = None,
+        num_beams: int = None,
+        schema_txt: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Generate SQL for several questions in one padded forward pass
+
+        Args:
+            questions: Natural language questions
+            max_new_tokens: Maximum tokens to generate
+            num_beams: Number of beams; chosen per question length when omitted
+            schema_txt: Prompt schema; defaults to the one given at construction
+
+        Returns:
+            Generated SQL queries, in the same order as the questions
+        """
+        max_new_tokens = max_new_tokens or config.MAX_TOKENS
+
+        if not questions:
+            return []
+
+        # Same per-question budget and beam policy as generate()
+        budgets = [_decoding_budget(q, max_new_tokens, num_beams) for q in questions]
+        schema_hash, prefix_ids = self._prompt_prefix(schema_txt)
+        keys = [
+            (schema_hash, q.strip(), *budget) for q, budget in zip(questions, budgets)
+        ]
+        results = [self._get_cached_sql(key) for key in keys]
+        misses = [i for i, sql in enumerate(results) if sql is None]
+        if not misses:
+            return results
+
+        logger.info("Generating SQL for a batch of %d questions", len(misses))
+
+        # One generate() call per beam count and slice of at most
+        # GENERATION_BATCH_SIZE, so a large request neither exhausts memory nor
+        # holds the generate lock for its whole length
+        groups: Dict[int, List[int]] = {}
+        for i in misses:
+            groups.setdefault(budgets[i][1], []).append(i)
+        step = config.GENERATION_BATCH_SIZE
+        slices = [
+            (beams, group[start : start + step])
+            for beams, group in groups.items()
+            for start in range(0, len(group), step)
+        ]
+
+        for beams, group in slices:
+            enc = self._encode_prompts([questions[i] for i in group], prefix_ids)
+
+            with self._generate_lock, torch.inference_mode():
+                out = self.model.generate(
+                    input_ids=enc.input_ids,
+                    attention_mask=enc.attention_mask,
+                    max_new_tokens=max(budgets[i][0] for i in group),
+                    pad_token_id=self.tok.eos_token_id,
+                    **self._decoding_kwargs(beams),
+                )
+
+            # Cut each row back to its own budget, after the decoder start token
+            decoded = self.tok.batch_decode(
+                [row[: budgets[i][0] + 1] for i, row in zip(group, out)],
+                skip_special_tokens=True,
+            )
+            for i, sql in zip(group, decoded):
+                results[i] = sql.strip()
+                self._cache_sql(keys[i], results[i])
+        return results
+
     def get_model_info(self) -> Dict[str, Any]:
         """Get model information"""
         return {
@@ -169,6 +536,7 @@ class T2SQLGenerator:
             "max_input_length": config.MAX_INPUT_LENGTH,
             "max_output_tokens": config.MAX_TOKENS,
             "caching_enabled": self.enable_caching,
+            "quantization": config.QUANTIZATION,
             "cuda_available": torch.cuda.is_available(),
             "model_dtype": str(self.model.dtype)
             if hasattr(self.model, "dtype")
@@ -8,19 +8,31 @@ Rules:
 - No partial or incomplete queries
 """
 
-def build_prompt(schema_snippet: str, question: str, fewshots: str = "") -> str:
-    # Truncate schema if too long to fit within token limits
-    max_schema_length = 200
-    if len(schema_snippet) > max_schema_length:
-        schema_snippet = schema_snippet[:max_schema_length] + "..."
-    
+# Truncate schema if too long to fit within token limits
+_MAX_SCHEMA_LENGTH = 200
+
+def _truncate_schema(schema_snippet: str) -> str:
+    if len(schema_snippet) > _MAX_SCHEMA_LENGTH:
+        return schema_snippet[:_MAX_SCHEMA_LENGTH] + "..."
+    return schema_snippet
+
+def build_prefix(schema_snippet: str, fewshots: str = "") -> str:
+    # Everything before the question, identical for every question. Tokenizing it
+    # apart from the suffix matches the full prompt only because the two are
+    # joined by whitespace and SentencePiece (T5) adds a dummy-prefix "▁" to the
+    # suffix, the same token that whitespace becomes; BPE tokenizers differ.
+    # f-strings compile to a single BUILD_STRING, cheaper than % or Template here
     return f"""{SYSTEM_RULES}
 
 Schema:
-{schema_snippet}
+{_truncate_schema(schema_snippet)}
 
 Examples:
-{fewshots}
+{fewshots}"""
 
-Q: {question}
-SQL:"""
\ No newline at end of file
+def build_suffix(question: str) -> str:
+    return f"""Q: {question}
+SQL:"""
+
+def build_prompt(schema_snippet: str, question: str, fewshots: str = "") -> str:
+    return f"{build_prefix(schema_snippet, fewshots)}\n\n{build_suffix(question)}"
\ No newline at end of file
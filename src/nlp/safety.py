@@ -1,23 +1,54 @@
 import re
 import sqlglot
+from sqlglot import exp
 
-DDL_DML = re.compile(r"(?i)\\b(UPDATE|DELETE|DROP|ALTER|INSERT|CREATE|TRUNCATE|GRANT|REVOKE)\\b")
+DDL_DML = frozenset(
+    ("update", "delete", "drop", "alter", "insert", "create", "truncate", "grant", "revoke")
+)
+# Whole words only, so columns such as created_at or updated_at are not flagged
+_WORD = re.compile(r"\w+")
 
-def is_safe_select(sql: str) -> bool:
-    if not sql.strip().lower().startswith("select"):
-        return False
-    if DDL_DML.search(sql):
-        return False
+# Statements that must never appear anywhere in a generated query
+_WRITE_NODES = (
+    exp.Update, exp.Delete, exp.Drop, exp.Insert, exp.Create, exp.AlterTable,
+    exp.Merge, exp.Command,
+)
+
+def _parse_select(sql: str):
+    # Parse once and return the AST if sql is a single read-only query, else None
+    if not DDL_DML.isdisjoint(_WORD.findall(sql.casefold())):
+        return None
     try:
-        sqlglot.parse_one(sql)  # syntax check
-        return True
+        statements = [s for s in sqlglot.parse(sql, read="sqlite") if s is not None]
     except Exception:
-        return False
+        return None
+    # parse_one would silently drop everything after the first statement
+    if len(statements) != 1 or not isinstance(statements[0], (exp.Select, exp.Union)):
+        return None
+    tree = statements[0]
+    if tree.find(*_WRITE_NODES):
+        return None
+    return tree
+
+def _with_limit(tree, default_limit: int) -> str:
+    if not tree.args.get("limit"):
+        tree.set("limit", exp.Limit(expression=exp.Literal.number(default_limit)))
+    return tree.sql(dialect="sqlite")
+
+def validate_and_limit(sql: str, default_limit: int = 200) -> tuple[bool, str]:
+    # Safety check and LIMIT enforcement from a single parse
+    tree = _parse_select(sql)
+    if tree is None:
+        return False, sql
+    return True, _with_limit(tree, default_limit)
+
+def is_safe_select(sql: str) -> bool:
+    return _parse_select(sql) is not None
 
 def ensure_limit(sql: str, default_limit: int = 200) -> str:
     # append LIMIT if none present
     try:
-        tree = sqlglot.parse_one(sql)
+        tree = sqlglot.parse_one(sql, read="sqlite")
         if not tree.args.get("limit"):
             return f"{sql.rstrip(';')} LIMIT {default_limit};"
         return sql
@@ -0,0 +1,77 @@
+"""
+Request coalescing for the generation endpoints
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Tuple
+
+from config.config import config
+from src.utils.logger import get_logger
+
+logger = get_logger("text2sql.batching")
+
+
+class BatchCoalescer:
+    """Merge near-simultaneous single questions into generate_batch calls"""
+
+    def __init__(
+        self,
+        generate_batch: Callable[..., List[str]],
+        window: float = 0.02,
+        max_batch_size: int = None,
+    ):
+        self._generate_batch = generate_batch
+        self._window = window
+        self._max_batch_size = max_batch_size or config.GENERATION_BATCH_SIZE
+        self._pending: "queue.Queue[Tuple[str, str, Future]]" = queue.Queue()
+
+        self._worker = threading.Thread(
+            target=self._run, name="generation-coalescer", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, question: str, schema_txt: str) -> Future:
+        """Queue a question; the future resolves to its generated SQL"""
+        future: Future = Future()
+        self._pending.put((question, schema_txt, future))
+        return future
+
+    def _drain(self) -> List[Tuple[str, str, Future]]:
+        """Block for one request, then collect whatever arrives within the window"""
+        batch = [self._pending.get()]
+        deadline = time.monotonic() + self._window
+
+        while len(batch) < self._max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        """Worker loop: one generate_batch call per schema in each drained batch"""
+        while True:
+            by_schema: Dict[str, List[Tuple[str, Future]]] = {}
+            for question, schema_txt, future in self._drain():
+                by_schema.setdefault(schema_txt, []).append((question, future))
+
+            for schema_txt, batch in by_schema.items():
+                try:
+                    sqls = self._generate_batch(
+                        [question for question, _ in batch], schema_txt=schema_txt
+                    )
+                except Exception as e:
+                    logger.error("Batched generation failed: %s", e)
+                    for _, future in batch:
+                        future.set_exception(e)
+                    continue
+
+                for (_, future), sql in zip(batch, sqls):
+                    future.set_result(sql)
@@ -0,0 +1,30 @@
+"""
+Process-wide resources shared across Streamlit reruns and sessions
+"""
+
+from typing import Any, Dict
+
+import streamlit as st
+from sqlalchemy.engine import Engine
+
+from src.db.connect import get_engine
+from src.db.introspect import precompute_schema
+from src.nlp.generator import T2SQLGenerator
+from src.utils.logger import get_logger
+
+logger = get_logger("text2sql.resources")
+
+
+@st.cache_resource(show_spinner=False)
+def get_cached_engine(db_url: str) -> Engine:
+    """Create the SQLAlchemy engine once per database URL"""
+    return get_engine(db_url)
+
+
+@st.cache_resource(show_spinner=False)
+def get_ui_singletons(db_url: str) -> Dict[str, Any]:
+    """Build the engine and load the language model once per server process"""
+    engine = get_cached_engine(db_url)
+    generator = T2SQLGenerator(schema_txt=precompute_schema(engine))
+    logger.info("UI singletons initialized for %s", db_url)
+    return {"engine": engine, "generator": generator}
@@ -1,11 +1,16 @@
+import asyncio
+import functools
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from src.db.connect import get_engine
-from src.db.introspect import get_schema_summary, to_compact_schema
+from src.db.introspect import get_schema_summary, precompute_schema
 from src.nlp.generator import T2SQLGenerator
-from src.nlp.safety import ensure_limit, is_safe_select
-import pandas as pd
+from src.nlp.safety import validate_and_limit
+from src.service.batching import BatchCoalescer
+from src.utils.json_io import json_line
 from sqlalchemy import text
+from sqlalchemy.engine import Engine
 
 app = FastAPI(title="Text-to-SQL API", version="0.1.0")
 
@@ -18,38 +23,103 @@ class Ask(BaseModel):
     execute: bool = True
     db_url: str = "sqlite:///data/demo.sqlite"
 
+class AskBatch(BaseModel):
+    questions: list[str]
+    execute: bool = True
+    db_url: str = "sqlite:///data/demo.sqlite"
+
+@functools.lru_cache(maxsize=16)
+def _resources(db_url: str) -> tuple[Engine, str]:
+    # Engine and prompt schema are resolved once per URL, not per request
+    eng = get_engine(db_url)
+    return eng, precompute_schema(eng)
+
+def _generator(schema_txt: str) -> T2SQLGenerator:
+    # One model per process; each call passes its own database's schema
+    return T2SQLGenerator(schema_txt=schema_txt)
+
+@functools.lru_cache(maxsize=None)
+def _coalescer(gen: T2SQLGenerator) -> BatchCoalescer:
+    # One worker per generator, so concurrent requests share forward passes
+    return BatchCoalescer(gen.generate_batch)
+
 @app.get("/health", response_model=Health)
-def health():
+async def health():
     try:
         eng = get_engine("sqlite:///data/demo.sqlite")
-        tables, _ = get_schema_summary(eng)
+        tables, _ = await asyncio.to_thread(get_schema_summary, eng)
         return Health(status="ok", tables=tables)
     except Exception:
         return Health(status="ok", tables=[])
 
-@app.post("/text2sql")
-def text2sql(req: Ask):
-    eng = get_engine(req.db_url)
-    tables, cols = get_schema_summary(eng)
-    schema_txt = to_compact_schema(tables, cols)
-    gen = T2SQLGenerator(schema_txt=schema_txt)
-
-    sql_raw = gen.generate(req.question)
-    sql_safe = ensure_limit(sql_raw)
+def _answer(eng, sql_raw: str, execute: bool) -> dict:
+    safe, sql_safe = validate_and_limit(sql_raw)
 
-    if not is_safe_select(sql_safe):
+    if not safe:
         return {"sql": sql_safe, "error": "Generated SQL failed safety checks."}
 
-    if not req.execute:
+    if not execute:
         return {"sql": sql_safe}
 
     try:
-        with eng.begin() as conn:
-            df = pd.read_sql(text(sql_safe), conn)
+        # Plain row tuples; only the 50 returned rows become dicts
+        with eng.connect() as conn:
+            result = conn.execute(text(sql_safe))
+            columns = list(result.keys())
+            rows = result.fetchall()
         return {
             "sql": sql_safe,
-            "rows": int(len(df)),
-            "data": df.head(50).to_dict(orient="records")
+            "rows": len(rows),
+            "data": [dict(zip(columns, row)) for row in rows[:50]]
         }
     except Exception as e:
-        return {"sql": sql_safe, "error": str(e)}
\ No newline at end of file
+        return {"sql": sql_safe, "error": str(e)}
+
+@app.post("/text2sql")
+async def text2sql(req: Ask):
+    # Model loading, generation and queries all run off the event loop
+    eng, schema_txt = await asyncio.to_thread(_resources, req.db_url)
+    gen = await asyncio.to_thread(_generator, schema_txt)
+
+    # Concurrent single requests are coalesced into padded batches per schema
+    sql_raw = await asyncio.wrap_future(
+        _coalescer(gen).submit(req.question, schema_txt)
+    )
+    return await asyncio.to_thread(_answer, eng, sql_raw, req.execute)
+
+@app.post("/text2sql/batch")
+async def text2sql_batch(req: AskBatch):
+    eng, schema_txt = await asyncio.to_thread(_resources, req.db_url)
+    gen = await asyncio.to_thread(_generator, schema_txt)
+
+    sqls = await asyncio.to_thread(
+        gen.generate_batch, req.questions, schema_txt=schema_txt
+    )
+    results = await asyncio.to_thread(
+        lambda: [_answer(eng, sql_raw, req.execute) for sql_raw in sqls]
+    )
+    return {"results": results}
+
+def _sse(event: str, data) -> bytes:
+    # One server-sent event; JSON keeps newlines in SQL off the wire framing
+    return f"event: {event}\ndata: ".encode() + json_line(data) + b"\n"
+
+@app.post("/text2sql/stream")
+async def text2sql_stream(req: Ask):
+    eng, schema_txt = await asyncio.to_thread(_resources, req.db_url)
+    gen = await asyncio.to_thread(_generator, schema_txt)
+
+    # A sync generator: Starlette iterates it in its thread pool
+
+    def events():
+        pieces = []
+        try:
+            for piece in gen.generate_stream(req.question, schema_txt=schema_txt):
+                pieces.append(piece)
+                yield _sse("token", piece)
+        except Exception as e:
+            yield _sse("error", {"error": str(e)})
+            return
+        yield _sse("result", _answer(eng, "".join(pieces).strip(), req.execute))
+
+    return StreamingResponse(events(), media_type="text/event-stream")
\ No newline at end of file
@@ -10,10 +10,9 @@ import sys
 
 sys.path.append("/app")
 
-from src.db.connect import get_engine
 from src.db.introspect import get_schema_summary, to_compact_schema
-from src.nlp.generator import T2SQLGenerator
-from src.nlp.safety import is_safe_select, ensure_limit
+from src.nlp.safety import ensure_limit, validate_and_limit
+from src.service.resources import get_cached_engine, get_ui_singletons
 from src.utils.logger import get_logger
 from src.utils.exceptions import (
     ModelLoadError,
@@ -21,7 +20,9 @@ from src.utils.exceptions import (
     SQLGenerationError,
     SQLSafetyError,
 )
-from config.config import config
+from config.config import config, configure
+
+configure()
 
 # Setup logging
 logger = get_logger("text2sql.ui")
@@ -56,26 +57,26 @@ if os.getenv("WEBSITE_SITE_NAME"):
 def get_schema_text(db_url: str) -> str:
     """Get database schema with caching"""
     try:
-        eng = get_engine(db_url)
+        eng = get_cached_engine(db_url)
         tables, cols = get_schema_summary(eng)
         schema = to_compact_schema(tables, cols)
-        logger.info(f"Schema loaded successfully: {len(tables)} tables")
+        logger.info("Schema loaded successfully: %d tables", len(tables))
         return schema
     except Exception as e:
-        logger.error(f"Failed to load schema: {str(e)}")
+        logger.error("Failed to load schema: %s", e)
         raise DatabaseConnectionError(f"Failed to load database schema: {str(e)}")
 
 
 def run_query(db_url: str, sql: str) -> pd.DataFrame:
     """Execute SQL query safely"""
     try:
-        eng = get_engine(db_url)
+        eng = get_cached_engine(db_url)
         with eng.begin() as conn:
             df = pd.read_sql(text(sql), conn)
-        logger.info(f"Query executed successfully: {len(df)} rows returned")
+        logger.info("Query executed successfully: %d rows returned", len(df))
         return df
     except Exception as e:
-        logger.error(f"Query execution failed: {str(e)}")
+        logger.error("Query execution failed: %s", e)
         raise SQLGenerationError(f"Query execution failed: {str(e)}")
 
 
@@ -177,6 +178,17 @@ st.sidebar.caption(
     "Tip: Use the demo DB seeder if needed: `python src/db/seed_demo.py`"
 )
 
+# Load the model with the page rather than on the first "Generate SQL" click
+if st.session_state.model_info is None:
+    try:
+        with st.spinner("Loading language model..."):
+            st.session_state.model_info = get_ui_singletons(db_url)[
+                "generator"
+            ].get_model_info()
+    except Exception as e:
+        # Surfaced with full context when the user generates SQL
+        logger.warning("Model preload failed: %s", e)
+
 # -------------------------
 # Title & Intro
 # -------------------------
@@ -257,11 +269,11 @@ if gen_button and question.strip():
             "Initializing language model (this may take a moment on first use)..."
         ):
             try:
-                gen = T2SQLGenerator(schema_txt=schema_txt)
+                gen = get_ui_singletons(db_url)["generator"]
                 st.session_state.model_info = gen.get_model_info()
                 logger.info("Model initialized successfully")
             except Exception as e:
-                logger.error(f"Model initialization failed: {str(e)}")
+                logger.error("Model initialization failed: %s", e)
                 raise ModelLoadError(f"Failed to initialize language model: {str(e)}")
 
         # Generate SQL with progress indicator
@@ -269,13 +281,21 @@ if gen_button and question.strip():
             try:
                 t0 = time.time()
                 sql_raw = gen.generate(
-                    question.strip(), max_new_tokens=max_tokens, num_beams=num_beams
+                    question.strip(),
+                    max_new_tokens=max_tokens,
+                    num_beams=num_beams,
+                    schema_txt=schema_txt,
                 )
-                sql_safe = ensure_limit(sql_raw, default_limit=int(auto_limit))
+                if enable_safety:
+                    safe, sql_safe = validate_and_limit(
+                        sql_raw, default_limit=int(auto_limit)
+                    )
+                else:
+                    sql_safe = ensure_limit(sql_raw, default_limit=int(auto_limit))
                 gen_ms = int((time.time() - t0) * 1000)
-                logger.info(f"SQL generated successfully in {gen_ms}ms")
+                logger.info("SQL generated successfully in %dms", gen_ms)
             except Exception as e:
-                logger.error(f"SQL generation failed: {str(e)}")
+                logger.error("SQL generation failed: %s", e)
                 raise SQLGenerationError(f"Failed to generate SQL: {str(e)}")
 
         # Display generated SQL
@@ -285,7 +305,6 @@ if gen_button and question.strip():
         # Safety check
         if enable_safety:
             try:
-                safe = is_safe_select(sql_safe)
                 if not safe:
                     raise SQLSafetyError("SQL failed safety checks")
             except SQLSafetyError:
@@ -335,7 +354,7 @@ if gen_button and question.strip():
                 )
 
             except Exception as e:
-                logger.error(f"Query execution failed: {str(e)}")
+                logger.error("Query execution failed: %s", e)
                 st.session_state.history.append(
                     {
                         "q": question,
@@ -369,9 +388,9 @@ if gen_button and question.strip():
     ) as e:
         st.error(f"Error occurred: {type(e).__name__}: {str(e)}")
         show_error_message(e)
-        logger.error(f"User-facing error: {str(e)}")
+        logger.error("User-facing error: %s", e)
     except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
+        logger.error("Unexpected error: %s", e)
         st.error(
             "**Unexpected Error**: An unexpected error occurred. Please try again or contact support."
         )
@@ -0,0 +1,20 @@
+"""
+Fast non-cryptographic hashing for in-memory cache keys
+
+Uses xxhash when it is installed and falls back to hashlib.blake2b.
+"""
+
+import hashlib
+
+try:
+    import xxhash
+except ImportError:  # Optional: fall back to hashlib.blake2b
+    xxhash = None
+
+
+def cache_key_hash(text: str) -> int:
+    """64-bit integer digest of text; for in-process cache keys, not security"""
+    data = text.encode()
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
@@ -0,0 +1,70 @@
+"""
+JSON file helpers for datasets and evaluation results
+
+Uses orjson when it is installed and falls back to the stdlib json module.
+"""
+
+import json
+from dataclasses import asdict, is_dataclass
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # Optional: fall back to the stdlib json module
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Serialize dataclasses and NumPy values for the stdlib json fallback"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    # NumPy scalars and arrays, without importing NumPy here
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dump_json(data: Any, path, indent: bool = True) -> None:
+    """
+    Write data to path as UTF-8 JSON
+
+    Args:
+        data: JSON-serializable object, dataclass instance or NumPy value
+        path: Output file path
+        indent: Pretty-print with two-space indentation
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(data, option=option))
+        return
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            data, f, indent=2 if indent else None, ensure_ascii=False, default=_default
+        )
+
+
+def json_line(data: Any) -> bytes:
+    """Encode data as a single newline-terminated JSON Lines record"""
+    if orjson is not None:
+        return orjson.dumps(
+            data,
+            option=orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY
+            | orjson.OPT_APPEND_NEWLINE,
+        )
+
+    return (json.dumps(data, ensure_ascii=False, default=_default) + "\n").encode()
+
+
+def load_json(path) -> Any:
+    """Read a UTF-8 JSON file"""
+    if orjson is not None:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -1,11 +1,18 @@
 """
 Logging configuration for Text-to-SQL Assistant
 """
+import atexit
 import logging
+import multiprocessing
+import queue
 import sys
 import os
-from datetime import datetime
-from typing import Optional
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# One background writer per log file, shared by every logger that uses it
+_file_queue_handlers: Dict[str, QueueHandler] = {}
 
 class ColoredFormatter(logging.Formatter):
     """Colored formatter for console output"""
@@ -20,9 +27,41 @@ class ColoredFormatter(logging.Formatter):
     }
     
     def format(self, record):
-        log_color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
-        record.levelname = f"{log_color}{record.levelname}{self.COLORS['RESET']}"
-        return super().format(record)
+        # Restore the level name afterwards; other handlers share this record
+        levelname = record.levelname
+        log_color = self.COLORS.get(levelname, self.COLORS['RESET'])
+        record.levelname = f"{log_color}{levelname}{self.COLORS['RESET']}"
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
+
+def _file_queue_handler(log_file: str, formatter: logging.Formatter) -> QueueHandler:
+    """Queue records for log_file and write them from a background thread"""
+    if multiprocessing.parent_process() is not None:
+        # Worker processes get their own file rather than interleaving writes
+        root, ext = os.path.splitext(log_file)
+        log_file = f"{root}.{os.getpid()}{ext}"
+
+    if log_file not in _file_queue_handlers:
+        # Ensure log directory exists
+        log_dir = os.path.dirname(log_file)
+        if log_dir and not os.path.exists(log_dir):
+            os.makedirs(log_dir, exist_ok=True)
+        
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setLevel(logging.DEBUG)  # File gets all levels
+        file_handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        # Flush whatever is still queued when the process exits
+        atexit.register(listener.stop)
+
+        _file_queue_handlers[log_file] = QueueHandler(log_queue)
+
+    return _file_queue_handlers[log_file]
 
 def setup_logger(
     name: str = "text2sql",
@@ -62,24 +101,16 @@ def setup_logger(
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(getattr(logging, level.upper()))
         
-        # Use colored formatter for console
-        colored_formatter = ColoredFormatter(
-            '%(asctime)s - %(levelname)s - %(message)s'
+        # Use colored formatter for interactive consoles only, not captured logs
+        formatter_cls = ColoredFormatter if sys.stdout.isatty() else logging.Formatter
+        console_handler.setFormatter(
+            formatter_cls('%(asctime)s - %(levelname)s - %(message)s')
         )
-        console_handler.setFormatter(colored_formatter)
         logger.addHandler(console_handler)
     
-    # File handler
+    # File handler, written off the calling thread so requests never wait on disk
     if log_file:
-        # Ensure log directory exists
-        log_dir = os.path.dirname(log_file)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir, exist_ok=True)
-        
-        file_handler = logging.FileHandler(log_file)
-        file_handler.setLevel(logging.DEBUG)  # File gets all levels
-        file_handler.setFormatter(detailed_formatter)
-        logger.addHandler(file_handler)
+        logger.addHandler(_file_queue_handler(log_file, detailed_formatter))
     
     # Prevent duplicate logs
     logger.propagate = False
@@ -114,18 +145,20 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
 # Performance logging decorator
 def log_performance(func):
     """Decorator to log function execution time"""
+    logger = get_logger("performance")
+
     def wrapper(*args, **kwargs):
-        logger = get_logger("performance")
-        start_time = datetime.now()
+        # Monotonic integer clock; no datetime objects on the hot path
+        start_ns = time.perf_counter_ns()
         
         try:
             result = func(*args, **kwargs)
-            execution_time = (datetime.now() - start_time).total_seconds()
-            logger.info(f"{func.__name__} completed in {execution_time:.3f}s")
+            execution_time = (time.perf_counter_ns() - start_ns) / 1e9
+            logger.info("%s completed in %.3fs", func.__name__, execution_time)
             return result
         except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
-            logger.error(f"{func.__name__} failed after {execution_time:.3f}s: {str(e)}")
+            execution_time = (time.perf_counter_ns() - start_ns) / 1e9
+            logger.error("%s failed after %.3fs: %s", func.__name__, execution_time, e)
             raise
     
     return wrapper
@@ -0,0 +1,143 @@
+"""
+Unit tests for the benchmark runner's cached regression baselines
+"""
+
+import dataclasses
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import eval.benchmark as benchmark
+from eval.benchmark import BenchmarkRunner
+from eval.datasets.dataset_loader import DatasetLoader
+from eval.evaluator import AggregateEvaluationResults
+
+pytestmark = pytest.mark.unit
+
+BASELINE = "org/baseline"
+CURRENT = "org/current"
+
+
+def _results(f1: float) -> AggregateEvaluationResults:
+    return AggregateEvaluationResults(
+        dataset_name="tiny",
+        total_questions=1,
+        successful_generations=1,
+        successful_executions=1,
+        avg_exact_match=f1,
+        avg_precision=f1,
+        avg_recall=f1,
+        avg_f1_score=f1,
+        execution_success_rate=1.0,
+        avg_execution_time=0.0,
+        avg_result_accuracy=1.0,
+        component_scores={},
+        avg_generation_time=0.0,
+        total_evaluation_time=0.0,
+        error_types={},
+        failed_questions=[],
+    )
+
+
+class _InlineExecutor(ThreadPoolExecutor):
+    """Run 'worker processes' as threads so fakes stay patchable"""
+
+    def __init__(self, max_workers=None, max_tasks_per_child=None):
+        super().__init__(max_workers=max_workers)
+
+
+@pytest.fixture
+def runner(tmp_path, monkeypatch):
+    datasets_dir = tmp_path / "datasets"
+    (datasets_dir / "custom").mkdir(parents=True)
+    (datasets_dir / "custom" / "tiny.json").write_text(
+        json.dumps(
+            {
+                "dataset_name": "tiny",
+                "questions": [
+                    {"id": "q1", "question": "Show users", "sql": "SELECT 1"}
+                ],
+            }
+        )
+    )
+
+    # refs/main of the baseline model in a private model cache
+    model_cache = tmp_path / "models"
+    ref = model_cache / "models--org--baseline" / "refs" / "main"
+    ref.parent.mkdir(parents=True)
+    ref.write_text("sha-1")
+    monkeypatch.setattr(
+        benchmark,
+        "config",
+        dataclasses.replace(benchmark.config, MODEL_CACHE_DIR=str(model_cache)),
+    )
+
+    evaluated = []
+
+    def fake_evaluate_model(database_url, dataset, model, *args):
+        evaluated.append(model)
+        return _results(0.8 if model == BASELINE else 0.78)
+
+    monkeypatch.setattr(benchmark, "ProcessPoolExecutor", _InlineExecutor)
+    monkeypatch.setattr(benchmark, "_evaluate_model", fake_evaluate_model)
+
+    runner = BenchmarkRunner(
+        f"sqlite:///{tmp_path / 'db.sqlite'}", str(tmp_path / "results")
+    )
+    runner.dataset_loader = DatasetLoader(str(datasets_dir))
+    runner._warm_model_cache = lambda model_names: None
+    runner.report_generator.generate_comparison_report = (
+        lambda results, out: "report.html"
+    )
+    runner.evaluated = evaluated
+    runner.model_ref = ref
+    return runner
+
+
+def _reported_models(runner):
+    files = sorted(runner.results_dir.glob("model_comparison_*.json"))
+    return list(json.loads(files[-1].read_text())["models"])
+
+
+def test_regression_miss_evaluates_baseline_and_stores_it(runner):
+    assert runner.run_regression_test("tiny", BASELINE, CURRENT)
+
+    assert runner.evaluated == [BASELINE, CURRENT]
+    stored = json.loads(runner._baseline_path("tiny", BASELINE).read_text())
+    assert stored["fingerprint"]["model_snapshot"] == "sha-1"
+    assert stored["results"]["avg_f1_score"] == 0.8
+
+
+def test_regression_hit_reuses_baseline_and_still_reports_it(runner):
+    runner.run_regression_test("tiny", BASELINE, CURRENT)
+    runner.evaluated.clear()
+
+    assert runner.run_regression_test("tiny", BASELINE, CURRENT)
+
+    assert runner.evaluated == [CURRENT]
+    assert _reported_models(runner) == [BASELINE, CURRENT]
+
+
+@pytest.mark.parametrize("change", ["model_snapshot", "dataset", "num_beams"])
+def test_regression_reruns_baseline_when_fingerprint_changes(
+    runner, monkeypatch, change
+):
+    runner.run_regression_test("tiny", BASELINE, CURRENT)
+    runner.evaluated.clear()
+
+    if change == "model_snapshot":
+        runner.model_ref.write_text("sha-2")
+    elif change == "dataset":
+        dataset_file = runner.dataset_loader.datasets_dir / "custom" / "tiny.json"
+        dataset_file.write_text(
+            dataset_file.read_text().replace("Show users", "List users")
+        )
+    else:
+        monkeypatch.setattr(
+            benchmark, "config", dataclasses.replace(benchmark.config, NUM_BEAMS=4)
+        )
+
+    runner.run_regression_test("tiny", BASELINE, CURRENT)
+
+    assert runner.evaluated == [BASELINE, CURRENT]
@@ -0,0 +1,98 @@
+"""
+Unit tests for the custom dataset loader and its pickle cache
+"""
+
+import dataclasses
+import json
+import os
+
+import pytest
+
+import eval.datasets.dataset_loader as dataset_loader
+from eval.datasets.dataset_loader import DatasetLoader
+
+pytestmark = pytest.mark.unit
+
+DATASET = {
+    "dataset_name": "tiny",
+    "version": "2.0.0",
+    "description": "Two questions",
+    "schema": {"database": "demo", "tables": {"users": {"columns": ["id", "name"]}}},
+    "questions": [
+        {
+            "id": "q1",
+            "question": "Show users",
+            "sql": "SELECT * FROM users",
+            "difficulty": "easy",
+            "tags": ["select"],
+        },
+        {
+            "id": "q2",
+            "question": "Count users",
+            "sql": "SELECT COUNT(*) FROM users",
+            "expected_result_count": 1,
+            "tags": ["aggregate", "count"],
+        },
+    ],
+}
+
+
+@pytest.fixture
+def loader(tmp_path):
+    (tmp_path / "custom").mkdir()
+    (tmp_path / "custom" / "tiny.json").write_text(json.dumps(DATASET))
+    return DatasetLoader(str(tmp_path))
+
+
+def _write_later(path, data):
+    """Rewrite path with an mtime safely after the current pickle's"""
+    stat = path.stat()
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+
+
+def test_load_writes_pickle_and_reuses_it(loader):
+    first = loader.load_custom_dataset("tiny.json")
+
+    assert (loader.datasets_dir / "custom" / "tiny.pkl").exists()
+    assert loader.load_custom_dataset("tiny.json") == first
+    assert first.total_questions == 2
+    assert first.questions[1].tags == ("aggregate", "count")
+
+
+def test_editing_json_invalidates_pickle(loader):
+    loader.load_custom_dataset("tiny.json")
+
+    edited = dict(DATASET, questions=DATASET["questions"][:1], version="2.1.0")
+    _write_later(loader.datasets_dir / "custom" / "tiny.json", edited)
+
+    dataset = loader.load_custom_dataset("tiny.json")
+    assert dataset.version == "2.1.0"
+    assert [q.id for q in dataset.questions] == ["q1"]
+
+
+def test_streamed_and_eager_loads_are_equal(tmp_path, monkeypatch):
+    pytest.importorskip("ijson")
+    (tmp_path / "custom").mkdir()
+    (tmp_path / "custom" / "tiny.json").write_text(json.dumps(DATASET))
+    cache_path = tmp_path / "custom" / "tiny.pkl"
+
+    streamed = DatasetLoader(str(tmp_path)).load_custom_dataset("tiny.json")
+    cache_path.unlink()
+    monkeypatch.setattr(dataset_loader, "ijson", None)
+    eager = DatasetLoader(str(tmp_path)).load_custom_dataset("tiny.json")
+
+    assert streamed == eager
+
+
+def test_questions_and_datasets_are_frozen(loader):
+    dataset = loader.load_custom_dataset("tiny.json")
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        dataset.questions[0].question = "changed"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        dataset.name = "changed"
+
+    renamed = dataclasses.replace(dataset, name="renamed")
+    assert renamed.name == "renamed"
+    assert dataset.name == "tiny"
@@ -0,0 +1,83 @@
+"""
+Unit tests for the read-only SQL safety gate
+"""
+
+import pytest
+from sqlglot import exp
+
+from src.nlp import safety
+from src.nlp.safety import ensure_limit, is_safe_select, validate_and_limit
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT name FROM users",
+        "select * from users where created_at > '2025-01-01'",
+        "SELECT u.name, SUM(o.total) FROM users u JOIN orders o ON o.user_id = u.id "
+        "GROUP BY u.name",
+        "SELECT name FROM users UNION SELECT sku FROM items",
+    ],
+)
+def test_accepts_single_read_only_query(sql):
+    assert is_safe_select(sql)
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "DELETE FROM users",
+        "UPDATE users SET name = 'x'",
+        "DROP TABLE users",
+        "INSERT INTO users VALUES (5, 'Eve', 'US')",
+        "SELECT * FROM users; DROP TABLE users",
+        "SELECT 1; SELECT 2",
+        "PRAGMA writable_schema = 1",
+        "SELECT * FROM users WHERE",
+        "",
+    ],
+)
+def test_rejects_writes_multiple_statements_and_invalid_sql(sql):
+    assert not is_safe_select(sql)
+    assert validate_and_limit(sql) == (False, sql)
+
+
+def test_rejects_select_containing_write_node(monkeypatch):
+    # The keyword screen catches these first, so feed the AST check directly
+    tree = exp.select("*").from_("users").where(exp.Command(this="VACUUM"))
+    monkeypatch.setattr(safety, "DDL_DML", frozenset())
+    monkeypatch.setattr(safety.sqlglot, "parse", lambda sql, read: [tree])
+
+    assert not is_safe_select("SELECT * FROM users WHERE VACUUM")
+
+
+def test_validate_and_limit_adds_default_limit():
+    safe, sql = validate_and_limit("SELECT name FROM users", default_limit=50)
+    assert safe
+    assert sql == "SELECT name FROM users LIMIT 50"
+
+
+def test_validate_and_limit_limits_whole_union():
+    safe, sql = validate_and_limit("SELECT name FROM users UNION SELECT sku FROM items")
+    assert safe
+    assert sql.endswith("UNION SELECT sku FROM items LIMIT 200")
+
+
+def test_validate_and_limit_keeps_existing_limit():
+    assert validate_and_limit("SELECT name FROM users LIMIT 5") == (
+        True,
+        "SELECT name FROM users LIMIT 5",
+    )
+
+
+def test_ensure_limit_appends_only_when_missing():
+    assert (
+        ensure_limit("SELECT name FROM users;", 10)
+        == "SELECT name FROM users LIMIT 10;"
+    )
+    assert (
+        ensure_limit("SELECT name FROM users LIMIT 3")
+        == "SELECT name FROM users LIMIT 3"
+    )
@@ -0,0 +1,49 @@
+"""
+Unit tests for SQL-level evaluation metrics
+"""
+
+import re
+
+import pytest
+
+from eval.metrics.sql_metrics import SQLMetricsCalculator
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def calculator():
+    return SQLMetricsCalculator()
+
+
+def _regex_normalize(sql: str) -> str:
+    """normalize_sql as written with re.sub before the split/join rewrite"""
+    if not sql:
+        return ""
+    sql = re.sub(r"\s+", " ", sql.strip().lower())
+    sql = sql.rstrip(";")
+    return re.sub(r"limit\s+\d+", "limit 200", sql)
+
+
+def test_precision_recall_empty_ground_truth_and_prediction(calculator):
+    assert calculator.calculate_precision_recall([], []) == (1.0, 1.0)
+
+
+def test_precision_recall_empty_ground_truth_with_prediction(calculator):
+    assert calculator.calculate_precision_recall(["users.name"], []) == (0.0, 0.0)
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "",
+        "SELECT name FROM users",
+        "  SELECT  name\n\tFROM users  ;",
+        "SELECT *\r\nFROM orders\nWHERE total > 100\nLIMIT   5;",
+        "select\u00a0id\u2003from\x0bitems\x0climit\n10",
+        "SELECT name FROM users;;",
+        "SELECT country, COUNT(*) FROM users GROUP BY country ORDER BY 2 DESC",
+    ],
+)
+def test_normalize_sql_matches_regex_whitespace_collapse(calculator, sql):
+    assert calculator.normalize_sql(sql) == _regex_normalize(sql)